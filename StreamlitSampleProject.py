@@ -1,83 +1,32 @@
 from __future__ import division
+import io
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-from scipy import stats
-from scipy.stats import pearsonr
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn import preprocessing
-
-# Import necessary libraries for machine learning models
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.svm import SVR
-from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.metrics import mean_absolute_error
-
-import joblib
+
+# pandas, the plotting libraries and scikit-learn are imported further down by the steps that first
+# need them, so the landing page renders without waiting for them on a cold start
 
 ## label encoding on dataset
 
 # Caching expensive operations
+# A cache_resource object is one instance per server process, used by every session's script thread at once,
+# so the shared caches below (model registry, ingestion, figure and page caches) lock their own state.
+# One model registry per server process, so any session can reuse a configuration that was already trained
 @st.cache_resource
-def train_models(X_train_scaled, y_train):
-    models = {
-        "Linear Regression": LinearRegression(),
-        "Decision Tree Regressor": DecisionTreeRegressor(),
-        "Random Forest Regressor": RandomForestRegressor(),
-        "KNN Regressor": KNeighborsRegressor(),
-        "SVM Regressor": SVR()
-    }
-    trained_models = {}
-    for name, model in models.items():
-        model.fit(X_train_scaled, y_train)
-        trained_models[name] = model
-    return trained_models
+def get_model_registry():
+    return ModelRegistry(max_entries=16)
 
 
+# Keep the saved bundle memory-mapped between reruns; saving a new version changes the key
 @st.cache_resource
-def scale_data(X_train, X_test):
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    return scaler, X_train_scaled, X_test_scaled
-
-
-# # Function to clean dataset by converting object columns to appropriate data types
-def clean_dataset(data):
-#     # Step 1: Convert object columns to numeric where possible, but keep original value if conversion fails
-    for col in data.select_dtypes(include=['object']).columns:
-#         # Try to convert to numeric, if not possible keep the original value
-        data[col] = data[col].apply(lambda x: pd.to_numeric(x, errors='ignore') if isinstance(x, str) else x)
-
-#     # Step 2: Convert columns that may be dates, but keep original value if conversion fails
-    for col in data.select_dtypes(include=['object']).columns:
-#         # Try to convert to datetime, if not possible keep the original value
-        try:
-            data[col] = pd.to_datetime(data[col], errors='ignore')
-        except:
-            pass  # Ignore errors during datetime conversion
-
-#   # Step 3: Remove missing values
-    # data = data.dropna()
+def load_saved_bundle(model_filename, version):
+    if version is None:
+        raise FileNotFoundError(model_filename)
+    return load_bundle(model_filename)
 
-    # Step 3: Convert object data types to string.
-    for col in data.select_dtypes(include=['object']).columns:
-        data[col] = data[col].astype('string')
-
-#     # Step 4: Infer remaining object columns
-    # data = data.infer_objects()
-#
-#     # Step 5: Return the cleaned dataset
-    return data
-
-label_encoder = preprocessing.LabelEncoder()
 
 
 # Sidebar for file uploads
@@ -87,58 +36,258 @@ uploaded_files = st.sidebar.file_uploader("Choose one or more CSV files", type="
 # Dictionary to hold multiple datasets
 datasets = {}
 
-if uploaded_files:
+
+# Fold assignments depend only on the dataset and its row count, so every model configuration reuses them
+@st.cache_data
+def dataset_folds(dataset_key, n_rows, n_folds):
+    return make_folds(n_rows, n_folds)
+
+
+# X and y are not hashed: model_key identifies them, including the lean and streaming options that change them
+@st.cache_data
+def cross_validate(dataset_key, model_key, n_folds, _X, _y, _models):
+    start = time.perf_counter()
+    cv_performance = cross_validate_models(_X, _y, dataset_folds(dataset_key, len(_X), n_folds), _models)
+    return cv_performance, time.perf_counter() - start
+
+
+# Profile each dataset once; lean mode is part of the key because it changes the column dtypes
+@st.cache_data
+def dataset_profile(dataset_key, lean, _data):
+    return DatasetProfile(_data)
+
+
+# Finished search rounds are kept on disk, so a repeated search resumes in any session
+@st.cache_resource
+def get_search_cache():
+    return SearchCache(cache_dir=".search_cache")
+
+
+# One ingestion cache per server process, shared by every session and rerun
+@st.cache_resource
+def get_ingestion_cache():
+    return IngestionCache(cache_dir=".ingestion_cache")
+
+
+def ingestion_key(dataset_key, lean):
+    # The format version keeps frames parsed by older code out; memory-lean frames are cached
+    # separately, their numeric columns are downcast
+    key = f"v{DATASET_FORMAT_VERSION}-{dataset_key}"
+    return f"{key}-lean" if lean else key
+
+
+def load_datasets(uploaded_files, lean=False):
+    """Return {file name: (dataset_key, data)}, parsing all uploads missing from the ingestion cache at once."""
+    # Hash each upload only once per session, then look the parsed and cleaned frames up by content
+    file_hashes = st.session_state.setdefault("file_hashes", {})
+    ingestion_cache = get_ingestion_cache()
+    loaded = {}
+    uncached = []
     for uploaded_file in uploaded_files:
-        # Read each uploaded dataset and store it in a dictionary with the filename as the key
-        datasets[uploaded_file.name] = pd.read_csv(uploaded_file)
+        if uploaded_file.file_id not in file_hashes:
+            file_hashes[uploaded_file.file_id] = content_hash(uploaded_file.getvalue())
+        dataset_key = file_hashes[uploaded_file.file_id]
+        data = ingestion_cache.get(ingestion_key(dataset_key, lean))
+        if data is None:
+            uncached.append(uploaded_file)
+        else:
+            loaded[uploaded_file.name] = (dataset_key, data)
 
-    # Select dataset from uploaded files
-    selected_file = st.sidebar.selectbox("Select a dataset to proceed with:", options=list(datasets.keys()))
+    # Parse, clean and categorize the new uploads concurrently in a worker pool
+    contents = [uploaded_file.getvalue() for uploaded_file in uncached]
+    with ThreadPoolExecutor() as pool:
+        frames = list(pool.map(lambda file_bytes: parse_dataset(file_bytes, lean), contents))
+    for uploaded_file, data in zip(uncached, frames):
+        dataset_key = file_hashes[uploaded_file.file_id]
+        ingestion_cache.put(ingestion_key(dataset_key, lean), data)
+        loaded[uploaded_file.name] = (dataset_key, data)
+    return loaded
 
-    # Select the dataset to proceed with
-    data = datasets[selected_file]
 
-    # Clean the dataset (convert object columns to numeric or datetime)
-    data_cleaned = clean_dataset(data)
+def load_combined_dataset(loaded, dedupe=True, lean=False):
+    # One dataset made of every upload, cached under a key derived from the files' keys
+    dataset_key = combined_key([key for key, _ in loaded.values()], dedupe)
+    ingestion_cache = get_ingestion_cache()
+    data = ingestion_cache.get(ingestion_key(dataset_key, lean))
+    if data is None:
+        data = union_datasets([frame for _, frame in loaded.values()], dedupe)
+        if lean:
+            data = downcast_numeric(data)
+        ingestion_cache.put(ingestion_key(dataset_key, lean), data)
+    return dataset_key, data
 
-    visual_data = data_cleaned.copy()
-    visual_data = visual_data.drop_duplicates()
 
-    visual_data['furniture'] = label_encoder.fit_transform(visual_data['furniture'])
-    visual_data['type'] = label_encoder.fit_transform(visual_data['type'])
-    visual_data['url'] = label_encoder.fit_transform(visual_data['url'])
-    visual_data['sale'] = visual_data['sale'].str.replace('%', '').astype(float)
+# Profile the upload in chunks (Steps 4, 6 and 7) without building another full copy of it
+@st.cache_data
+def stream_dataset_profile(dataset_key, _uploaded_file):
+    def prepare(chunk):
+        return parse_sale(drop_unused_columns(chunk))
+
+    return profile_csv(io.BytesIO(_uploaded_file.getvalue()), prepare=prepare)
+
+
+# Step 9 on the streamed path: ANOVA aggregates are accumulated chunk by chunk after outlier removal
+@st.cache_data
+def stream_dataset_anova(dataset_key, _uploaded_file, categorical_columns, target, lower_bound, upper_bound):
+    def prepare(chunk):
+        return remove_outliers(parse_sale(drop_unused_columns(chunk)), lower_bound, upper_bound)
+
+    return anova_csv(io.BytesIO(_uploaded_file.getvalue()), list(categorical_columns), target, prepare=prepare)
+
+
+# One figure cache per server process; charts are keyed by their data, so any session can reuse them
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(max_entries=128)
+
+
+def show_chart(draw, chart_type, data, columns=(), **style):
+    # Only call draw() when this chart type has not been rendered for this data, column(s) and styling
+    st.image(get_figure_cache().render(chart_key(chart_type, data, columns, **style), draw))
+
+
+# One page cache per server process; pages are keyed by their frame's key, so any session can reuse them
+@st.cache_resource
+def get_page_cache():
+    return PageCache()
+
+
+def show_preview(frame, frame_key, name, full=False):
+    # Only one page of a large frame is sent to the browser, unless the full tables were opted into
+    if full or len(frame) <= PAGE_SIZE:
+        st.dataframe(frame, use_container_width=True)
+        return
+    pages = page_count(len(frame))
+    page = st.number_input(f"Page of the {name} ({pages:,} pages)", min_value=1, max_value=pages, value=1,
+                           key=f"page_{name}")
+    start, stop = page_bounds(len(frame), page)
+    st.dataframe(get_page_cache().page(frame_key, frame, page), use_container_width=True)
+    st.caption(f"Rows {start + 1:,} to {stop:,} of {len(frame):,}.")
+
+
+# The binned pairplot grids only depend on the dataset, so compute them once per dataset
+@st.cache_data
+def pairplot_grids(dataset_key, columns, _pair_data):
+    return binned_pair_grids(_pair_data, list(columns))
+
+
+if uploaded_files:
+    import pandas as pd
+
+    from anova_engine import anova_csv
+    from batch_scoring import score_csv
+    from encoding import CategoricalDictionary
+    from ingestion_cache import IngestionCache, content_hash
+    from instrumentation import METRICS_FILENAME, PROMETHEUS_FILENAME, StepMetrics
+    from memory_budget import MemoryBudget, MemoryBudgetExceeded, downcast_numeric, enable_copy_on_write
+    from model_bundle import BUNDLE_FILENAME, bundle_version, load_bundle, save_bundle, saved_version
+    from pipeline import (DATASET_FORMAT_VERSION, combined_key, parse_dataset, union_datasets, parse_sale,
+                          drop_unused_columns, build_visual_data, encode_categoricals, iqr_bounds, count_outliers, remove_outliers, classify_correlations, anova, split_data,
+                          scale_data, select_best_model, retrain_best_model, build_bundle)
+    from preview import PAGE_SIZE, PageCache, page_bounds, page_count
+    from profiler import DatasetProfile
+    from step_graph import StepGraph
+    from streaming_stats import profile_csv
+
+    # Derived frames share column buffers with their parent instead of copying them
+    enable_copy_on_write()
+
+    for uploaded_file in uploaded_files:
+        # Store each uploaded file in a dictionary with the filename as the key
+        datasets[uploaded_file.name] = uploaded_file
+
+    # Several files (e.g. monthly exports) can be combined into one dataset instead of picking one
+    combine_files = len(datasets) > 1 and st.sidebar.checkbox("Combine all uploaded files into one dataset", value=False)
+    dedupe_files = combine_files and st.sidebar.checkbox("Drop rows repeated across files", value=True)
+
+    # Select dataset from uploaded files
+    selected_file = st.sidebar.selectbox("Select a dataset to proceed with:", options=list(datasets.keys()),
+                                         disabled=combine_files)
+
+    # Memory-lean mode downcasts numeric columns on ingest and stops at the first stage over the memory budget
+    lean_mode = st.sidebar.checkbox("Memory-lean mode", value=False)
+    if lean_mode:
+        budget_mb = st.sidebar.number_input("Peak memory budget in MB (0 for no limit)", min_value=0, value=0, step=256)
+        memory_budget = MemoryBudget(budget_mb or None)
+        memory_panel = st.sidebar.empty()
+    else:
+        memory_budget = None
+
+    def check_memory(stage, *frames):
+        if memory_budget is None:
+            return
+        try:
+            memory_budget.checkpoint(stage, *frames)
+        except MemoryBudgetExceeded as error:
+            st.error(f"{error} Raise the budget in the sidebar or turn on streaming statistics.")
+            st.stop()
+        finally:
+            memory_panel.dataframe(memory_budget.report(), use_container_width=True)
+
+    # Wall time, CPU time, memory and rows of every step of this rerun
+    step_metrics = StepMetrics()
+    step_metrics.start("Ingest")
+
+    # Every upload is parsed at once (served from the ingestion cache when these bytes were seen before)
+    loaded_datasets = load_datasets(uploaded_files, lean=lean_mode)
+    if combine_files:
+        dataset_key, data = load_combined_dataset(loaded_datasets, dedupe_files, lean=lean_mode)
+        total_rows = sum(len(frame) for _, frame in loaded_datasets.values())
+        st.sidebar.caption(f"Combined {len(loaded_datasets)} files: {len(data):,} of {total_rows:,} rows kept.")
+    else:
+        dataset_key, data = loaded_datasets[selected_file]
+    check_memory("Ingest", data)
+    step_metrics.labels["dataset"] = dataset_key[:16]
+    step_metrics.finish(rows=len(data))
+    categorical_dictionary = CategoricalDictionary.from_frame(data)
+
+    # Streaming mode reads the file in chunks and builds the summary statistics incrementally (one file only)
+    streaming_mode = st.sidebar.checkbox("Streaming statistics (read the file in chunks)", value=False,
+                                         disabled=combine_files) and not combine_files
+    streamed_profile = stream_dataset_profile(dataset_key, datasets[selected_file]) if streaming_mode else None
+    data_cleaned = data
+
+    # Previews show one page of rows at a time; sending whole multi-million-row frames to the browser is opt-in
+    full_tables = st.sidebar.checkbox("Show full tables (slow on large files)", value=False)
+
+    # The heavy stages below are memoized per session and only recomputed when their declared inputs change
+    graph = st.session_state.setdefault("step_graph", StepGraph())
+    graph.start_run()
+    dataset_inputs = (dataset_key, lean_mode)
+
+    # Encode the categorical variables, parse 'sale' and log 'price' for visualization
+    visual_data = graph.run("Visual data", lambda: build_visual_data(data), dataset_inputs)
+    check_memory("Visual data", data, visual_data)
 
-    logprice = np.log1p(visual_data['price'])
-    visual_data['price'] = logprice
-    
     # Main section for displaying and processing the selected dataset
     st.title(f"Processing Dataset: Furniture Prices")
 
     # Step 1: Display a sample of the selected dataset
     st.write("## Step 1: Reading the dataset")
+    step_metrics.start("Step 1: Reading the dataset", rows=len(data))
 
     st.write("Firstly, we read the raw and uncleaned data to see what we're dealing with. We do this with the 'pd.read_csv' function.")
 
-    st.dataframe(data_cleaned, use_container_width=True)
+    show_preview(data, ("Raw data",) + dataset_inputs, "raw data", full_tables)
 
-    data_cleaned = data.drop_duplicates()          
+    data_cleaned = graph.run("Drop duplicates", lambda: data.drop_duplicates(), dataset_inputs)
 
     # Check and drop "Unnamed: 0" column if it exists
     if "Unnamed: 0" in data_cleaned.columns:
         data_cleaned = data_cleaned.drop(columns=["Unnamed: 0"])
         st.write("Dropped 'Unnamed: 0' column from the dataset.")
-        st.dataframe(data_cleaned, use_container_width=True)
+        show_preview(data_cleaned, (graph.key("Drop duplicates"), "Unnamed: 0"), "deduplicated data", full_tables)
+
+    # One pass over the deduplicated data gives the type, summary, outlier and missing value tables of Steps 1 to 7
+    profile = dataset_profile(dataset_key, lean_mode, data_cleaned)
 
     # Display the cleaned data types
     st.write("### Cleaned Data Types")
-    dtype_df = pd.DataFrame(data_cleaned.dtypes, columns=["Data Type"]).reset_index().rename(
-        columns={"index": "Column Name"})
-    st.dataframe(dtype_df, use_container_width=True)
+    st.dataframe(profile.dtype_table(), use_container_width=True)
 
     # Display the shape and columns of the selected dataset
     st.write("### Dataset Information")
-    st.write(f"### Shape: `{data_cleaned.shape}`")
+    st.write(f"### Shape: `{profile.shape}`")
     st.write("Columns in the dataset:", data_cleaned.columns.tolist())
 
     # Step 1: Display a sample of the selected dataset
@@ -146,7 +295,7 @@ if uploaded_files:
 
     st.write(" Here we've given each categorical variables an ID and grouped them so we can treat them as continuous. We removed the percentage sign from 'sale' so we can convert them into integers and treat them as continuous as well. We also logged each 'price' instance to scale them down. We created this data to make it easier to visualise. ")
 
-    st.dataframe(visual_data, use_container_width=True)
+    show_preview(visual_data, graph.key("Visual data"), "visualization data", full_tables)
 
     # # Step 2: Problem Statement Definition
     # st.write("## Step 2: Problem Statement Definition")
@@ -155,6 +304,7 @@ if uploaded_files:
 
     # Step 2: Problem Statement Definition
     st.write("## Step 2: Problem Statement Definition")
+    step_metrics.start("Step 2: Problem Statement Definition", rows=len(data_cleaned))
 
     # Displaying the problem statement
     st.write("""
@@ -177,23 +327,45 @@ if uploaded_files:
 
     # Step 3 - Visualizing the Target Variable
     st.write("## Step 3: Visualizing the Target Variable")
+    step_metrics.start("Step 3: Visualizing the Target Variable", rows=len(data_cleaned))
 
     st.write("Here we can see how our target variable (price) is distributed with a histogram. The bell curve signifies a normal distribution which means it is good for analysis.")
 
-    fig, ax = plt.subplots()
-    ax.hist(visual_data[target], bins=30, edgecolor='k', alpha=0.7)
-    ax.set_title(f"Distribution of {target}")
-    ax.set_xlabel(target)
-    ax.set_ylabel('Frequency')
-    st.pyplot(fig)
+    # The first chart loads matplotlib and seaborn
+    import matplotlib.pyplot as plt
+
+    from figure_cache import FigureCache, chart_key
+    from plotting import (PAIRPLOT_ROW_THRESHOLD, PAIRPLOT_SAMPLE_SIZE, PAIRPLOT_BINS, stratified_sample,
+                          binned_pair_grids, draw_binned_pairplot, draw_pairplot, draw_histogram, draw_countplot,
+                          draw_heatmap, draw_boxplot, draw_model_comparison)
+
+    show_chart(lambda: draw_histogram(visual_data[target], target), "histogram", visual_data[target], target)
 
     st.write("This is a graph of scatter plots. Our program went through each column in the dataset and compared it to each other column through a scatter plot. A total of 7 variables gives us 49 plots.")
 
     # Plot a pairplot of all numeric columns in the dataset
-    numeric_cols1 = visual_data.select_dtypes(include=['float64', 'int64']).columns
+    numeric_cols1 = visual_data.select_dtypes(include=['number']).columns
     if len(numeric_cols1) > 1:
-        sns.pairplot(visual_data[numeric_cols1].dropna())
-        st.pyplot(plt.gcf())
+        pair_data = visual_data[numeric_cols1].dropna()
+
+        # Large datasets are drawn from a stratified sample or from density bins instead of every point
+        if len(pair_data) > PAIRPLOT_ROW_THRESHOLD:
+            pairplot_mode = st.radio("This dataset is large, so the pairplot is drawn from:",
+                                     ["A stratified sample", "Density bins (all rows)"], horizontal=True)
+        else:
+            pairplot_mode = "All points"
+
+        if pairplot_mode == "A stratified sample":
+            sample = stratified_sample(pair_data, PAIRPLOT_SAMPLE_SIZE, stratify_by="type")
+            show_chart(lambda: draw_pairplot(sample), "pairplot", sample, numeric_cols1)
+            st.caption(f"Drawing {len(sample):,} of {len(pair_data):,} points, sampled in proportion to each furniture type.")
+        elif pairplot_mode == "Density bins (all rows)":
+            grids = pairplot_grids(dataset_key, tuple(numeric_cols1), pair_data)
+            show_chart(lambda: draw_binned_pairplot(grids), "binned_pairplot", pair_data, numeric_cols1, bins=PAIRPLOT_BINS)
+            st.caption(f"All {len(pair_data):,} points binned into a {PAIRPLOT_BINS}x{PAIRPLOT_BINS} grid per panel (colour shows log count).")
+        else:
+            show_chart(lambda: draw_pairplot(pair_data), "pairplot", pair_data, numeric_cols1)
+            st.caption(f"Drawing all {len(pair_data):,} points.")
     else:
         st.write("Not enough numeric variables to plot a pairplot.")
 
@@ -203,12 +375,13 @@ if uploaded_files:
     st.write("Our lives will be made easier if we filter through the data and find any variables that would not be relevant for analysis. In this case, we've found 'url' to be an irrelevant column to our analysis. Because of this, we removed it from the data.")
     data_cleaned = data_cleaned.drop('url', axis=1)
     visual_data = visual_data.drop('url', axis=1)
-    st.dataframe(data_cleaned, use_container_width=True)
+    show_preview(data_cleaned, (graph.key("Drop duplicates"), "Unnamed: 0", "url"), "data without 'url'", full_tables)
 
     # Step 4: Basic Data Exploration
     st.write("## Step 4: Data Exploration")
+    step_metrics.start("Step 4: Data Exploration", rows=len(data_cleaned))
 
-    data_cleaned['sale'] = data_cleaned['sale'].str.replace('%', '').astype(float)
+    data_cleaned = graph.run("Parse sale", lambda: parse_sale(data_cleaned), dataset_inputs, ["Drop duplicates"])
 
     st.write("Here we've summarised the types in the data. We can see which variables will be categorical (string) and which variables will be continuous (numerical). You can also see summaries regarding count, mean, standard deviation, minimum, maximum, and percentiles of each continuous variable.")
 
@@ -218,36 +391,32 @@ if uploaded_files:
     # Column 1: Data Types
     with col1:
         st.write("### Data Types:")
-        # Create a DataFrame for the column names and their corresponding data types
-        dtype_df = pd.DataFrame(data_cleaned.dtypes, columns=["Data Type"]).reset_index()
-        dtype_df = dtype_df.rename(columns={"index": "Column Name"})
-
-        st.dataframe(dtype_df, use_container_width=True)
+        # The column names and their data types once 'sale' is parsed, from the dataset profile
+        st.dataframe(profile.dtype_table(data_cleaned.columns, analysis=True), use_container_width=True)
         
     # Column 2: Summary Statistics
     with col2:
         st.write("### Summary Statistics:")
-        st.dataframe(data_cleaned.describe(), use_container_width=True)
+        if streamed_profile is not None:
+            st.dataframe(streamed_profile.describe(), use_container_width=True)
+            st.caption("Streamed statistics: quartiles are approximate and duplicate rows are included.")
+        else:
+            st.dataframe(profile.describe(data_cleaned.columns), use_container_width=True)
 
     # Step 5: Visual EDA - Histograms for Continuous Variables
     st.write("## Step 5: Visual EDA - Histograms of Continuous Variables / Bar Plots of Categorical Variables")
+    step_metrics.start("Step 5: Visual EDA", rows=len(data_cleaned))
 
     st.write("Here we have the opportunity to visualize our variables independently. Continuous (numerical) variables will be visualized using a histogram. Categorical (string) variables are visualized using bar plots.")
 
     continuous_columns = st.multiselect("Select continuous variables to visualize with histograms:",
-                                        visual_data.select_dtypes(include=['float64', 'int64']).columns)
+                                        visual_data.select_dtypes(include=['number']).columns)
 
     if continuous_columns:
         for column in continuous_columns:
-            # Create a new figure for each column
-            fig, ax = plt.subplots(figsize=(8, 3))
-            ax.hist(visual_data[column], bins=30, edgecolor='k', alpha=0.7)
-            ax.set_title(f"Distribution of {column}")
-            ax.set_xlabel(column)
-            ax.set_ylabel('Frequency')
-
-            # Display the individual figure
-            st.pyplot(fig)
+            # Display an individual figure for each column
+            show_chart(lambda: draw_histogram(visual_data[column], column, figsize=(8, 3)),
+                       "histogram", visual_data[column], column, figsize=(8, 3))
 
     st.write("Variable analysis: rate, sale, delivery, price.")
     st.write("The 'rate' histogram shows a large frequency of 0, reaching over 1500 occurences. Every other rating (1, 2, 3, 4, 5) doesn't break 250. This shows us that the overwhelming majority of our furniure items haven't been rated at all.")
@@ -258,7 +427,7 @@ if uploaded_files:
 
     # 2. Visualizing Categorical Variables using Bar Plots
     # Identify categorical columns (i.e., columns with object data types)
-    categorical_columns = visual_data.select_dtypes(include=['float64', 'int64']).columns
+    categorical_columns = visual_data.select_dtypes(include=['number']).columns
 
     # If categorical columns are available
     if len(categorical_columns) > 0:
@@ -272,13 +441,7 @@ if uploaded_files:
             st.write(f"#### Distribution of {column}")
         
             # Create a count plot (bar plot) for each categorical variable
-            fig, ax = plt.subplots()
-            sns.countplot(x=column, data=visual_data, ax=ax)
-            ax.set_title(f"Count of {column}")
-            ax.set_xlabel(column)
-            ax.set_ylabel('Frequency')
-        
-            st.pyplot(fig)
+            show_chart(lambda: draw_countplot(visual_data, column), "countplot", visual_data[column], column)
     else:
         st.write("No categorical variables available for bar plot visualization.")
 
@@ -287,32 +450,33 @@ if uploaded_files:
         
     # Step 6: Outlier Analysis
     st.write("## Step 6: Outlier Analysis")
+    step_metrics.start("Step 6: Outlier Analysis", rows=len(data_cleaned))
 
     st.write("Here we identify the outliers in each column. A piece of data is deemed an outlier if is in the bottom 25% quantile or top 25% quantile. We have only done this for our numeric columns as we can't identify outliers in categorical variables.")
     st.write("You'll notice that we haven't performed an outlier analysis on our 'rate' variable. If you go back to our previous step and look at the histogram for 'rate', you'll find that there are over 1500 instances of 0 rate.")
     st.write("While all other rate instances (1, 2, 3, 4, and 5) do not even break 250. Therefore, if we perform an outlier analysis on 'rate', we will only have 0's, which is not necessary for further data analysis.")
 
 
-    wRate = data_cleaned.copy()
+    # No copy needed: Copy-on-Write keeps wRate unchanged when data_cleaned is modified
+    wRate = data_cleaned
 
     # Select only continuous numerical columns
     data_cleaned = data_cleaned.drop('rate', axis=1)
-    numeric_cols = data_cleaned.select_dtypes(include=['float64', 'int64'])
+    numeric_cols = data_cleaned.select_dtypes(include=['number'])
 
     if not numeric_cols.empty:
         # Proceed with the outlier analysis if there are numeric columns
-        Q1 = numeric_cols.quantile(0.25)
-        Q3 = numeric_cols.quantile(0.75)
-        IQR = Q3 - Q1
-
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+        if streamed_profile is not None:
+            Q1 = streamed_profile.quantiles(0.25)[numeric_cols.columns]
+            Q3 = streamed_profile.quantiles(0.75)[numeric_cols.columns]
+            lower_bound, upper_bound = iqr_bounds(numeric_cols, Q1, Q3)
 
-        # Identifying outliers using the IQR method
-        outliers = (numeric_cols < (Q1 - 1.5 * IQR)) | (numeric_cols > (Q3 + 1.5 * IQR))
-
-        # Count outliers in each column
-        outlier_count = outliers.sum()
+            # Identifying outliers using the IQR method and counting them in each column
+            outlier_count = count_outliers(numeric_cols, lower_bound, upper_bound)
+        else:
+            # Bounds and counts were computed with the dataset profile
+            lower_bound, upper_bound = profile.iqr_bounds(numeric_cols.columns)
+            outlier_count = profile.outlier_counts(numeric_cols.columns)
 
         # Display the number of outliers in each column
         st.write("### Number of Outliers in Each Numeric Column")
@@ -325,10 +489,14 @@ if uploaded_files:
 
     # Step 7: Missing Value Analysis
     st.write("## Step 7: Missing Value Analysis")
+    step_metrics.start("Step 7: Missing Value Analysis", rows=len(data_cleaned))
 
     st.write("In this step, we've identified each index that is null or in other words, has no value. Part of the cleaning process is to identify all these missing values, as further data analysis on null values may cause errors and inconsistencies.")
 
-    missing_values = data_cleaned.isnull().sum()
+    if streamed_profile is not None:
+        missing_values = streamed_profile.missing_values()[data_cleaned.columns]
+    else:
+        missing_values = profile.missing_values(data_cleaned.columns)
     st.write("### Missing Values in Each Column")
     dtype_df_missing_values = pd.DataFrame(missing_values, columns=["Missing Values"]).reset_index()
     dtype_df_missing_values = dtype_df_missing_values.rename(columns={"index": "Column Name"})
@@ -339,15 +507,15 @@ if uploaded_files:
     st.write("Now that we've identified our outliers and missing values, we can clean the data to prepare it for prediction modelling. The first step is to remove each row that has an outlier in any of the numerical columns.")
     st.write("The second step is to replace each missing value with 0, to ensure that no errors occur in our further analysis. Attempting to perform functions on null values may prevent the program from continuing.")
 
-    final_data = data_cleaned[~((data_cleaned[numeric_cols.columns] < lower_bound) | (data_cleaned[numeric_cols.columns] > upper_bound)).any(axis=1)]
-    # filtered_df = data_cleaned[~(data_cleaned[numeric_cols.columns] < lower_bound) | (data_cleaned[numeric_cols.columns] > upper_bound)]
-    # corrDataFrame.insert(x, f"{i}", final_data[i], True)
-    final_data.insert(2, 'rate', wRate['rate'],True)
-    final_data = final_data.fillna(0)
-    st.dataframe(final_data, use_container_width=True)
+    # Remove outlier rows (keeping 'rate' out of the test) and replace missing values with 0
+    final_data = graph.run("Outlier filtering", lambda: remove_outliers(wRate, lower_bound, upper_bound),
+                           (streaming_mode,), ["Parse sale"])
+    check_memory("Outlier filtering", data, visual_data, data_cleaned, final_data)
+    show_preview(final_data, graph.key("Outlier filtering"), "outlier-filtered data", full_tables)
     
     # Step 8: Feature Selection - Correlation Analysis
     st.write("## Step 8: Feature Selection - Correlation Matrix")
+    step_metrics.start("Step 8: Feature Selection", rows=len(final_data))
 
     st.write("Here we will analyze the statistical correlation between each variable. Below is a heat map that shows the correlation between all of our furniture variables, including our categorical variables. ")
     st.write("By using the 'corr' function, we can find the specific correlation values that show how strong each correlation is. 1 is the highest correlation while -0.2 is the lowest. As you can see, the majority of our correlations are in the -0.2 to 0.2 range, meaning there is little correlation throughout our data.")
@@ -358,17 +526,15 @@ if uploaded_files:
     # selected_features = st.selectbox("Select the predictor variable (independent variable):", data_cleaned.columns)
 
     # Select only continuous numerical columns for correlation analysis
-    numeric_columns = visual_data.select_dtypes(include=['float64', 'int64'])
+    numeric_columns = visual_data.select_dtypes(include=['number'])
 
     if not numeric_columns.empty:
         # Calculate and display the correlation matrix
-        correlation_matrix = numeric_columns.corr()
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', ax=ax)
-        st.pyplot(fig)
+        correlation_matrix = graph.run("Correlation matrix", lambda: numeric_columns.corr(), (), ["Visual data"])
+        show_chart(lambda: draw_heatmap(correlation_matrix), "heatmap", correlation_matrix, cmap='coolwarm')
 
         selected_features = st.multiselect("Select predictor variables (independent variables):",
-        visual_data.select_dtypes(include=['float64', 'int64']).columns)
+        visual_data.select_dtypes(include=['number']).columns)
         
         # if target == 'price' or target == 'rate' or target == 'delivery':
         # #convert the data frame into series 
@@ -387,13 +553,11 @@ if uploaded_files:
         # else:
         #     st.write("probability value is not statistically significant")
 
-        new_visual = final_data.copy()
-
-        new_visual['furniture'] = label_encoder.fit_transform(new_visual['furniture'])
-        new_visual['type'] = label_encoder.fit_transform(new_visual['type'])
-
-        logprice = np.log1p(new_visual['price'])
-        new_visual['price'] = logprice
+        # A shallow copy shares final_data's columns, only the encoded and logged columns get new buffers
+        new_visual = graph.run("Encoded visual data",
+                               lambda: encode_categoricals(final_data.copy(deep=False), log_price=True),
+                               (), ["Outlier filtering"])
+        check_memory("Correlation", data, visual_data, final_data, new_visual)
 
         try:     
             # list1 = new_visual[f'{target}']
@@ -413,7 +577,9 @@ if uploaded_files:
         
             st.write("Pearson's correlation is an effective correlation formula that takes in an x variable, a y variable, and the means of both variables and outputs correlation coefficient. Pearson's correlation is most effective when analyzing linear data. Because the majority of our data has a weak correlation (and is not linear), the Pearson's correlation coefficient will most often be in the 0-0.3 range, which is considered weak. ")
             
-            st.dataframe(corrDataFrame.corr(method='pearson', min_periods=1), use_container_width=True)
+            pearson_matrix = graph.run("Pearson correlation", lambda: corrDataFrame.corr(method='pearson', min_periods=1),
+                                       (target, tuple(selected_features)), ["Encoded visual data"])
+            st.dataframe(pearson_matrix, use_container_width=True)
 
             st.write("Here we can see a scatter chart that plots the correlation between our target variable (price) and our selected predictor variable.")
 
@@ -423,17 +589,17 @@ if uploaded_files:
             st.write("### Correlation Matrix:")
             st.dataframe(correlation_matrix, use_container_width=True)
 
-            # Extract correlations with the target variable
-            target_correlations = correlation_matrix[target].drop(target)  # Drop correlation of target with itself
+            # Extract correlations with the target variable and classify them as strong, moderate and weak
+            correlations = classify_correlations(correlation_matrix, target)
+            target_correlations = correlations["all"]
 
             # Display the correlation of each feature with the target variable
             st.write(f"### Correlation of Features with Target Variable: `{target}`")
             st.dataframe(target_correlations, use_container_width=True)
 
-            # Identify strong, moderate, and weak relationships
-            strong_corr = target_correlations[target_correlations.abs() >= 0.7]
-            moderate_corr = target_correlations[(target_correlations.abs() >= 0.3) & (target_correlations.abs() < 0.7)]
-            weak_corr = target_correlations[target_correlations.abs() < 0.3]
+            strong_corr = correlations["strong"]
+            moderate_corr = correlations["moderate"]
+            weak_corr = correlations["weak"]
 
             # Display the correlations classified as strong, moderate, and weak
             st.write("### Strong Correlations (|correlation| ≥ 0.7):")
@@ -451,9 +617,10 @@ if uploaded_files:
 
     # Step 9: Statistical Feature Selection using ANOVA for Categorical Variables
     st.write("## Step 9: Statistical Feature Selection (ANOVA for Categorical Variables)")
+    step_metrics.start("Step 9: Statistical Feature Selection (ANOVA)", rows=len(final_data))
 
     # Select categorical columns for ANOVA analysis
-    categorical_columns = final_data.select_dtypes(include=['string'])
+    categorical_columns = final_data.select_dtypes(include=['string', 'category'])
 
     # agg_funcs = {
     #     'price' :'mean'
@@ -464,33 +631,13 @@ if uploaded_files:
 
         # Ensure the target variable is continuous
         if pd.api.types.is_numeric_dtype(final_data[target]):
-            # Dictionary to store ANOVA results
-            anova_results = []
-
-            # Perform ANOVA for each selected categorical variable
-            for cat_col in selected_categorical:
-                # df_apply=df.groupby(['Outlet_Establishment_Year'])['Item_MRP'].apply(lambda x: x - x.mean())
-                
-                # anova_groups = pd.DataFrame(final_data[cat_col])
-                # anova_groups.insert(1, f"{target}", final_data[target], True)
-
-                anova_groups = final_data.groupby(cat_col)[target].apply(list)
-                # df.groupby('Outlet_Location_Type').count()
-                # df.groupby('Outlet_Location_Type')['Item_Outlet_Sales']
-                # df.groupby('Outlet_Location_Type')['Item_Outlet_Sales'].sum()
-                
-                # anova_groups = final_data.groupby(cat_col).agg(agg_funcs)
-                # anova_groups = final_data.groupby(cat_col).sum()
-                
-                # anova_groups[f'{cat_col}'] = final_data.groupby(cat_col)[target].transform(np.mean)
-                
-                f_val, p_val = stats.f_oneway(*anova_groups)
-    
-                # Append the results to a list
-                anova_results.append({"Categorical Variable": cat_col, "F-value": f_val, "p-value": p_val})
-
-            # Convert results to DataFrame
-            anova_df = pd.DataFrame(anova_results)
+            # Perform ANOVA for each selected categorical variable and collect the results in a DataFrame
+            if streamed_profile is not None:
+                anova_df = stream_dataset_anova(dataset_key, datasets[selected_file], tuple(selected_categorical),
+                                                target, lower_bound, upper_bound)
+            else:
+                anova_df = graph.run("ANOVA", lambda: anova(final_data, selected_categorical, target),
+                                     (target, tuple(selected_categorical)), ["Outlier filtering"])
 
             # Display the ANOVA results
             st.write("### ANOVA Results")
@@ -518,11 +665,8 @@ if uploaded_files:
                 st.write("Here we chart our comparison of our categorical variable and our target variable using a box plot. Each box shows the minimum and maximum of each range with lines outside of the box. The area of the box itself shows the interquartile range (the range between the lower and upper quartile). A circle on the plot indicates a range of data that is more than 1.5 times the interquartile range, meaning it is an outlier.")
 
                 for cat_col in selected_categorical:
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.boxplot(x=cat_col, y=target, data=new_visual, ax=ax)
-                    ax.set_title(f"{cat_col} vs {target}")
-                    st.pyplot(fig)
+                    show_chart(lambda: draw_boxplot(new_visual, cat_col, target), "boxplot",
+                               new_visual[[cat_col, target]], (cat_col, target))
             else:
                 st.write("No categorical variables selected for ANOVA.")
 
@@ -533,9 +677,12 @@ if uploaded_files:
 
     # Step 10: Selecting Final Predictors for Building Machine Learning Model
     st.write("## Step 10: Selecting Final Predictors")
+    step_metrics.start("Step 10: Selecting Final Predictors", rows=len(final_data))
 
-    final_data['furniture'] = label_encoder.fit_transform(final_data['furniture'])
-    final_data['type'] = label_encoder.fit_transform(final_data['type'])
+    # Encoded on a shallow copy, the memoized outlier-filtered frame keeps its categories for Step 9
+    final_data = graph.run("Model encoding",
+                           lambda: encode_categoricals(final_data.copy(deep=False), dictionary=categorical_dictionary),
+                           (), ["Outlier filtering"])
 
     st.write("In Step 8, we selected predictor variables. These are going to be the variables we use for our prediction model. We input example instances into these predictor variables, and our prediction model will create a target variable (price) prediction based on those inputs.")
 
@@ -548,44 +695,74 @@ if uploaded_files:
 
         # Step 11: Data Preparation for Machine Learning
         st.write("## Step 11: Data Preparation for Machine Learning")
+        step_metrics.start("Step 11: Data Preparation for Machine Learning", rows=len(final_data))
 
         st.write("Here we can select the ratio between our train data and our test data. Our train data will be used to train the AI model for its prediction process. Our test data will be used to test the algorithm after its been trained, to make sure its working properly. The ideal ratio is 20-30% for testing and 70-80% for training.")
 
-        # Extracting the features and target variable
-        X = final_data[selected_features]
-        y = final_data[target]
-
-        # Splitting the data into train and test sets
+        # Extracting the features and target variable and splitting the data into train and test sets
         test_size = st.slider("Select the test size (percentage)", min_value=0.1, max_value=0.5, value=0.2, step=0.05)
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+        X, y, X_train, X_test, y_train, y_test = graph.run(
+            "Train/test split", lambda: split_data(final_data, selected_features, target, test_size),
+            (tuple(selected_features), target, test_size), ["Model encoding"])
 
         # Cache the scaler and scaled data
-        scaler, X_train_scaled, X_test_scaled = scale_data(X_train, X_test)
+        scaler, X_train_scaled, X_test_scaled = graph.run("Scaling", lambda: scale_data(X_train, X_test),
+                                                          (), ["Train/test split"])
+        check_memory("Split and scale", data, visual_data, final_data, new_visual, X_train, X_test)
         st.write(f"Train set shape: {X_train.shape}, Test set shape: {X_test.shape}")
 
         # Step 12: Model Training and Evaluation
         st.write("## Step 12: Model Training and Evaluation")
+        step_metrics.start("Step 12: Model Training and Evaluation", rows=len(X_train))
 
         st.write("In this step, the program takes in all the data we've inputted so far, and determines the best prediction model to use for our final output. The program compares Linear Regression, Decision Tree Regressor, Random  Forest Regressor, KNN Regressor, and SVM Regressor.")
         st.write("This Model Performance Table charts the MSE (Mean Squared Error), R2 Score (R-Squared), and MAE (Mean Absolute Error) of each potential prediction model. The MSE is the average squared difference between the value observed and the and the value predicted. The R2 score tells us the amount of variance of our target variable that is explained by our predictor variables. The MAE is simply the average size of mistakes the program has made in its data processing.")
-
-        # Check if models are already cached, otherwise train and cache them
-        if 'trained_models' not in st.session_state:
-            st.session_state.trained_models = train_models(X_train_scaled, y_train)
-
-        trained_models = st.session_state.trained_models
-
-        model_performance = {}
-        for name, model in trained_models.items():
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-
-            mse = mean_squared_error(y_test, y_pred)
-            r2 = r2_score(y_test, y_pred)
-            mae = mean_absolute_error(y_test, y_pred)
-
-            # Store the results in the dictionary
-            model_performance[name] = {"MSE": mse, "R2 Score": r2, "MAE": mae}
+        st.write("The five models are trained at the same time on separate CPU cores, and the table also shows how many seconds each model took to fit and to predict.")
+
+        # The training, search and registry modules (and joblib's process pool) load with the first training step
+        from hyperparameter_search import SearchCache, tune_models
+        from model_registry import ModelRegistry, registry_key
+        from model_training import build_candidate_models, cross_validate_models, make_folds, scale_variants, train_models
+
+        # Optional tuning: successive-halving search of each family, resumed from earlier searches of this data
+        candidate_models = build_candidate_models(len(X_train))
+        # Families that do not scale to this many training rows are replaced by scalable variants
+        model_variants = scale_variants(len(X_train))
+        if model_variants:
+            st.write("This training set is large, so some models were replaced by variants that scale to it:")
+            st.dataframe(pd.DataFrame(model_variants).T.rename_axis("Model Family"), use_container_width=True)
+        if st.checkbox("Tune hyperparameters before training"):
+            st.write("Each model family is searched with successive halving: many random settings are scored on a small sample of the rows, and only the best third move on to three times as many rows. Searches are saved, so pressing the button again continues with new settings.")
+            search_budget = st.slider("Search time budget (seconds)", min_value=10, max_value=600, value=60, step=10)
+            # Without the button the best settings found so far are used and nothing is searched
+            budget = search_budget if st.button("Search hyperparameters") else 0
+            candidate_models, search_summary = tune_models(X_train_scaled, y_train, candidate_models, dataset_key, target,
+                                                           selected_features, budget, cache=get_search_cache(),
+                                                           test_size=test_size, lean=lean_mode, streaming=streaming_mode)
+            if search_summary:
+                search_df = pd.DataFrame(search_summary).T
+                search_df["Best Parameters"] = search_df["Best Parameters"].astype(str)
+                st.dataframe(search_df.style.format(precision=2), use_container_width=True)
+            # Families without a finished round are left out of the table rather than shown with an empty score
+            unsearched = [name for name in candidate_models if name not in search_summary]
+            if unsearched:
+                st.write(f"Not searched yet, so trained with their default hyperparameters: {', '.join(unsearched)}. "
+                         "Searching again continues with these families first.")
+
+        # Look the configuration up in the model registry, otherwise train and score every model in parallel
+        model_registry = get_model_registry()
+        model_key = registry_key(dataset_key, target, selected_features, test_size, candidate_models,
+                                 lean=lean_mode, streaming=streaming_mode)
+        registry_entry = model_registry.get(model_key)
+        if registry_entry is None:
+            trained_models, model_performance = train_models(X_train_scaled, y_train, X_test_scaled, y_test, candidate_models)
+            model_registry.put(model_key, trained_models, model_performance)
+            # The fits run in worker processes, so they are recorded with the times measured there
+            step_metrics.add_model_fits(model_performance, len(X_train))
+            check_memory("Model training", data, visual_data, final_data, new_visual, X_train, X_test)
+        else:
+            trained_models, model_performance = registry_entry
+            st.write("These models were already trained for this dataset, target, feature selection and test size, so they were loaded from the model registry.")
 
         # Convert the performance dictionary to a pandas DataFrame for better visualization
         performance_df = pd.DataFrame(model_performance).T  # Transpose to get model names as rows
@@ -595,6 +772,7 @@ if uploaded_files:
             .background_gradient(subset=["MSE"], cmap="Blues", low=0, high=1) \
             .background_gradient(subset=["R2 Score"], cmap="Greens", low=0, high=1) \
             .background_gradient(subset=["MAE"], cmap="Reds", low=0, high=1) \
+            .format(precision=3, subset=["Fit Time (s)", "Predict Time (s)"]) \
             .set_properties(**{'text-align': 'center'}) \
             .set_table_styles([{
             'selector': 'th',
@@ -609,73 +787,70 @@ if uploaded_files:
         # Step 12: Visualizing the Performance Comparison between Models
         st.write("## Visualizing Model Performance Comparison")
 
-        # Extracting model names and their respective performance metrics
-        model_names = list(model_performance.keys())
-        mse_values = [model_performance[model]["MSE"] for model in model_names]
-        r2_values = [model_performance[model]["R2 Score"] for model in model_names]
-        mae_values = [model_performance[model]["MAE"] for model in model_names]
-
         # Creating a bar plot to compare MSE, R2, and MAE across models
-        fig, ax = plt.subplots(3, 1, figsize=(10, 12))
-
-        # MSE Comparison
-        ax[0].bar(model_names, mse_values, color='blue')
-        ax[0].set_title("Model Comparison: Mean Squared Error (MSE)")
-        ax[0].set_ylabel("MSE")
-
-        # R2 Score Comparison
-        ax[1].bar(model_names, r2_values, color='green')
-        ax[1].set_title("Model Comparison: R2 Score")
-        ax[1].set_ylabel("R2 Score")
-
-        # MAE Comparison
-        ax[2].bar(model_names, mae_values, color='red')
-        ax[2].set_title("Model Comparison: Mean Absolute Error (MAE)")
-        ax[2].set_ylabel("MAE")
-
-        # Display the plot
-        plt.tight_layout()
-        st.pyplot(fig)
+        show_chart(lambda: draw_model_comparison(performance_df), "model_comparison",
+                   performance_df[["MSE", "R2 Score", "MAE"]])
 
         # Step 13: Selecting the Best Model
         st.write("## Step 13: Selecting the Best Model")
+        step_metrics.start("Step 13: Selecting the Best Model", rows=len(X))
         st.write("The program determines what the best prediction model for our dataset and our selected variables is. The program finds the prediction model that produced the lowest MSE (Mean Squared Error) and selects it for prediction modelling.")
 
         # Check if model performance dictionary has been populated
         if model_performance:
-            # Select the model with the lowest MSE
-            best_model_mse = min(model_performance, key=lambda x: model_performance[x]["MSE"])
-            st.write(f"### Best Model based on Lowest Mean Squared Error (MSE): {best_model_mse}")
+            # Cross-validation scores every model on k folds, so one lucky or unlucky split cannot flip the choice
+            cv_performance = None
+            if st.checkbox("Select the best model with k-fold cross-validation"):
+                n_folds = st.slider("Number of folds", min_value=3, max_value=10, value=5)
+                cv_performance, cv_seconds = cross_validate(dataset_key, model_key, n_folds, X, y, candidate_models)
+                cv_df = pd.DataFrame(cv_performance).T
+                st.dataframe(cv_df.style.format(precision=2).format(precision=3, subset=["Fit Time (s)", "Predict Time (s)"]),
+                             use_container_width=True)
+                serial_seconds = (cv_df["Fit Time (s)"] + cv_df["Predict Time (s)"]).sum() * n_folds
+                st.caption(f"{len(cv_df)} models x {n_folds} folds were scored in parallel in {cv_seconds:.1f}s "
+                           f"(one after another they take about {serial_seconds:.1f}s).")
+
+            if cv_performance is None:
+                # Select the model with the lowest MSE
+                best_model_mse = select_best_model(model_performance)
+                st.write(f"### Best Model based on Lowest Mean Squared Error (MSE): {best_model_mse}")
+            else:
+                best_model_mse = select_best_model(cv_performance, "CV MSE Mean")
+                st.write(f"### Best Model based on Lowest Mean Cross-Validated MSE: {best_model_mse}")
 
             # Step 14: Retraining the Best Model on Entire Data
             st.write("## Step 14: Retraining the Best Model")
+            step_metrics.start("Step 14: Retraining the Best Model", rows=len(X))
             st.write("Step 14 involves retraining the model and reprocessing data to prepare for data prediction. The program does this with the 'fit_transform' function, which combines the 'fit' function and the 'transform' function from the 'sklearn' package. The 'fit' function calculates the various required parameters and the 'transform' function applies these parameters to our data.")
-            best_model = trained_models[best_model_mse]
-            # Retrain the best model on the entire dataset
-            # Combine and scale the entire dataset
-            X_combined_scaled = scaler.fit_transform(X)
-            best_model.fit(X_combined_scaled, y)
-
-            # Save the best model in session state and also as a file
-            if 'best_model' not in st.session_state:
-                st.session_state.best_model = best_model
-
-            # save the model after retraining
-            model_filename = "best_model.pkl"
-            joblib.dump(best_model, model_filename)
-            st.write(f"Model `{best_model_mse}` has been retrained and saved as `{model_filename}`.")
+            # The bundle version covers the data and configuration, so an unchanged model is neither retrained nor rewritten
+            model_filename = BUNDLE_FILENAME
+            version = bundle_version(dataset_key, target, selected_features, test_size, best_model_mse,
+                                     trained_models[best_model_mse], lean=lean_mode, streaming=streaming_mode)
+            if saved_version(model_filename) == version:
+                st.write(f"Model `{best_model_mse}` is unchanged; the bundle saved as `{model_filename}` is reused.")
+            else:
+                # Retrain a copy of the best model on the entire dataset, refitting the scaler on all of it
+                best_model, full_scaler = retrain_best_model(trained_models[best_model_mse], scaler, X, y)
+                bundle = build_bundle(best_model, full_scaler, selected_features, target, version, best_model_mse,
+                                      categorical_dictionary,
+                                      {**model_performance[best_model_mse], **(cv_performance or {}).get(best_model_mse, {})})
+                save_bundle(bundle, model_filename)
+                st.write(f"Model `{best_model_mse}` has been retrained and saved as `{model_filename}`.")
         else:
             st.write("No model performance results available. Please ensure models were trained successfully.")
 
         # Step 15: Model Deployment - Load the Saved Model and Predict
         st.write("## Step 15: Model Deployment - Predict Using Saved Model")
+        step_metrics.start("Step 15: Model Deployment", rows=len(X))
 
-        # Load the saved model
-        model_filename = "best_model.pkl"
+        # Load the saved model bundle
+        model_filename = BUNDLE_FILENAME
 
         try:
-            loaded_model = joblib.load(model_filename)
-            st.write(f"Model `{model_filename}` loaded successfully!")
+            bundle = load_saved_bundle(model_filename, saved_version(model_filename))
+            st.write(f"Model `{model_filename}` (version `{bundle.version}`) loaded successfully!")
+            st.caption(f"For other applications, `python prediction_server.py --model {model_filename}` serves the same "
+                       "model over HTTP on localhost and batches concurrent requests.")
 
             # Allow user to input values for the features
             st.write("### Provide the input values for prediction")
@@ -691,11 +866,8 @@ if uploaded_files:
                 # Convert the user inputs into a DataFrame
                 user_input_df = pd.DataFrame([user_input_values])
 
-                # Scale the user inputs using the same scaler
-                user_input_scaled = scaler.transform(user_input_df)
-
-                # Make predictions using the loaded model
-                predicted_value = loaded_model.predict(user_input_scaled)
+                # Scale the user inputs with the bundle's scaler and predict with its model
+                predicted_value = bundle.predict(user_input_df)
 
                 # Display the predicted value
                 st.write(f"### Predicted {target}: {predicted_value[0]:.2f}")
@@ -748,10 +920,37 @@ if uploaded_files:
                 # Display the plot
                 st.pyplot(fig)
 
+            # Bulk scoring: price every row of a catalogue CSV in vectorized chunks
+            st.write("### Score a whole catalogue")
+            catalogue = st.file_uploader("Upload a CSV of furniture rows to price", type="csv", key="catalogue")
+            if catalogue is not None and st.button("Score catalogue"):
+                scored_path = os.path.join(tempfile.gettempdir(), f"scored_{catalogue.file_id}.csv")
+                summary = score_csv(catalogue, scored_path, bundle)
+                st.session_state.scored_catalogue = (catalogue.name, scored_path, summary)
+
+            if 'scored_catalogue' in st.session_state:
+                catalogue_name, scored_path, summary = st.session_state.scored_catalogue
+                st.write(f"Scored {summary['rows']:,} rows of `{catalogue_name}` in {summary['seconds']:.2f}s "
+                         f"({summary['rows_per_second']:,.0f} rows/s).")
+                with open(scored_path, "rb") as scored_file:
+                    st.download_button("Download scored CSV", scored_file, file_name=f"scored_{catalogue_name}",
+                                       mime="text/csv")
+
         except FileNotFoundError:
             st.write(f"Model `{model_filename}` not found. Please ensure the model has been saved correctly.")
     else:
         st.write("No numeric features selected for training.")
+
+    # Every rerun's step metrics are appended to a JSON-lines log; the Prometheus file holds the latest rerun
+    step_metrics.finish()
+    step_metrics.append_jsonl(METRICS_FILENAME)
+    step_metrics.write_prometheus(PROMETHEUS_FILENAME)
+    with st.sidebar.expander("Step timings"):
+        st.dataframe(step_metrics.report().style.format(precision=3, na_rep="-"), use_container_width=True)
+
+    # Which stages this rerun recomputed and which it took from the step graph
+    with st.sidebar.expander("Recomputed stages"):
+        st.dataframe(graph.report().style.format(precision=3, subset=["Seconds"]), use_container_width=True)
 else:
     st.write("Please upload one or more CSV files from the sidebar to get started.")
 
@@ -0,0 +1,118 @@
+# One-way ANOVA computed from grouped aggregates.
+#
+# F and p only need each group's count, sum and sum of squares, so the groups are never
+# materialized as Python lists. The same aggregates can be accumulated chunk by chunk,
+# which lets ANOVA run on the streamed data path too.
+import numpy as np
+import pandas as pd
+
+from streaming_stats import CHUNK_SIZE, read_csv_chunks
+
+
+def anova_from_aggregates(count, total, total_sq):
+    """Return (F, p) from per-group counts, sums and sums of squares."""
+    # scipy is only loaded once an ANOVA is actually computed
+    from scipy import stats
+
+    count = np.asarray(count, dtype=float)
+    total = np.asarray(total, dtype=float)
+    total_sq = np.asarray(total_sq, dtype=float)
+    keep = count > 0
+    count, total, total_sq = count[keep], total[keep], total_sq[keep]
+
+    n = count.sum()
+    k = len(count)
+    if k < 2 or n <= k:
+        return np.nan, np.nan
+
+    between_term = (total ** 2 / count).sum()
+    ss_between = between_term - total.sum() ** 2 / n
+    ss_within = total_sq.sum() - between_term
+    df_between, df_within = k - 1, n - k
+    if ss_within <= 0:
+        return np.inf, 0.0
+    f_val = (ss_between / df_between) / (ss_within / df_within)
+    return f_val, stats.f.sf(f_val, df_between, df_within)
+
+
+def _group_sums(keys, values):
+    # Count, sum and sum of squares of values per distinct key, in one bincount pass each
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        codes, levels = keys.cat.codes.to_numpy(), keys.cat.categories
+    else:
+        codes, levels = pd.factorize(keys.to_numpy(), sort=False)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, group_values = codes[valid], values[valid]
+    count = np.bincount(codes, minlength=len(levels))
+    total = np.bincount(codes, weights=group_values, minlength=len(levels))
+    total_sq = np.bincount(codes, weights=group_values ** 2, minlength=len(levels))
+    return pd.DataFrame({"count": count, "sum": total, "sum_sq": total_sq}, index=levels)
+
+
+def one_way_anova(frame, categorical_columns, target):
+    """ANOVA of target across the levels of every categorical column, in one batch."""
+    values = frame[target].to_numpy(dtype=float, na_value=np.nan)
+    # Centre the target once to keep the sums of squares numerically stable
+    values = values - np.nanmean(values) if len(values) else values
+
+    anova_results = []
+    for cat_col in categorical_columns:
+        sums = _group_sums(frame[cat_col], values)
+        f_val, p_val = anova_from_aggregates(sums["count"], sums["sum"], sums["sum_sq"])
+        anova_results.append({"Categorical Variable": cat_col, "F-value": f_val, "p-value": p_val})
+    return pd.DataFrame(anova_results)
+
+
+class AnovaAccumulator:
+    """Accumulates the ANOVA aggregates of several categorical columns over chunks."""
+
+    def __init__(self, categorical_columns, target):
+        self.categorical_columns = list(categorical_columns)
+        self.target = target
+        self.shift = None
+        self.sums = {col: None for col in self.categorical_columns}
+
+    def update(self, chunk):
+        values = chunk[self.target].to_numpy(dtype=float, na_value=np.nan)
+        if self.shift is None:
+            # Shift every chunk by the first chunk's mean; ANOVA is unaffected by a constant shift
+            self.shift = np.nanmean(values) if np.isfinite(values).any() else 0.0
+        values = values - self.shift
+        for col in self.categorical_columns:
+            self._add(col, _group_sums(chunk[col], values))
+
+    def merge(self, other):
+        # Both sides must use the same shift for their sums to be added together
+        if self.shift is None:
+            self.shift = other.shift
+        for col, sums in other.sums.items():
+            if sums is None:
+                continue
+            if other.shift != self.shift:
+                delta = other.shift - self.shift
+                sums = sums.assign(sum_sq=sums["sum_sq"] + 2 * delta * sums["sum"] + delta ** 2 * sums["count"],
+                                   sum=sums["sum"] + delta * sums["count"])
+            self._add(col, sums)
+
+    def _add(self, col, sums):
+        current = self.sums.get(col)
+        self.sums[col] = sums if current is None else current.add(sums, fill_value=0)
+
+    def results(self):
+        anova_results = []
+        for cat_col in self.categorical_columns:
+            sums = self.sums[cat_col]
+            if sums is None:
+                f_val, p_val = np.nan, np.nan
+            else:
+                f_val, p_val = anova_from_aggregates(sums["count"], sums["sum"], sums["sum_sq"])
+            anova_results.append({"Categorical Variable": cat_col, "F-value": f_val, "p-value": p_val})
+        return pd.DataFrame(anova_results)
+
+
+def anova_csv(source, categorical_columns, target, chunksize=CHUNK_SIZE, schema=None, prepare=None):
+    """Run the one-way ANOVA over a CSV read in chunks."""
+    accumulator = AnovaAccumulator(categorical_columns, target)
+    for chunk in read_csv_chunks(source, chunksize, schema, prepare):
+        accumulator.update(chunk)
+    return accumulator.results()
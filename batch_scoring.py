@@ -0,0 +1,69 @@
+# Bulk scoring of whole catalogues with the saved model bundle.
+#
+# The CSV is read in chunks, each chunk gets the training-time cleaning, 'sale' parsing and
+# category codes, and is scaled and predicted with one vectorized call. Scored rows are
+# written out chunk by chunk, so the catalogue never has to fit in memory.
+#
+# Example:
+#     python batch_scoring.py catalogue.csv scored.csv --model best_model.joblib
+import argparse
+import time
+
+import pandas as pd
+
+from model_bundle import BUNDLE_FILENAME, load_bundle
+from pipeline import parse_sale
+from streaming_stats import CHUNK_SIZE
+from type_inference import apply_schema, infer_schema
+
+
+def prepare_features(chunk, bundle, schema, dictionary=None):
+    """Return the bundle's feature matrix for a raw chunk, cleaned and encoded as in training."""
+    features = chunk[[col for col in bundle.feature_names if col in chunk.columns]].copy()
+    features = apply_schema(features, {col: schema[col] for col in features.columns if col in schema})
+    return bundle.encode(parse_sale(features), dictionary)
+
+
+def score_csv(source, destination, bundle, chunksize=CHUNK_SIZE, prediction_column=None):
+    """Append a prediction column to every row of source and write the rows to destination.
+
+    destination is a path or a text file object. Returns the row count, time and rows per second.
+    """
+    prediction_column = prediction_column or f"predicted_{bundle.target}"
+    dictionary = bundle.dictionary
+    schema = None
+    rows = 0
+    start = time.perf_counter()
+    output = open(destination, "w", newline="") if isinstance(destination, str) else destination
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            if schema is None:
+                schema = infer_schema(chunk[[col for col in bundle.feature_names if col in chunk.columns]])
+            features = prepare_features(chunk, bundle, schema, dictionary)
+            chunk[prediction_column] = bundle.predict(features)
+            chunk.to_csv(output, header=rows == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if output is not destination:
+            output.close()
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds else float("inf")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price every row of a CSV with the saved best model.")
+    parser.add_argument("source", help="CSV of feature rows")
+    parser.add_argument("destination", help="CSV the scored rows are written to")
+    parser.add_argument("--model", default=BUNDLE_FILENAME, help="model bundle saved by the app or pipeline_cli.py")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows predicted per vectorized call")
+    parser.add_argument("--prediction-column", default=None, help="default: predicted_<target>")
+    args = parser.parse_args(argv)
+
+    summary = score_csv(args.source, args.destination, load_bundle(args.model), args.chunksize, args.prediction_column)
+    print(f"Scored {summary['rows']:,} rows in {summary['seconds']:.2f}s "
+          f"({summary['rows_per_second']:,.0f} rows/s) into {args.destination}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Scaling benchmark for the furniture price pipeline.
+#
+# Each stage is timed and memory-profiled (tracemalloc peak, parent process only) on
+# synthetic datasets of increasing size, and the results are written to a JSON file so
+# two versions can be compared.
+#
+# Example:
+#     python benchmark.py --rows 10000 100000 1000000 --output bench.json
+#     python benchmark.py --rows 10000 100000 --output new.json --compare bench.json
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmark_report import compare, environment
+from model_training import build_candidate_models, train_models
+from pipeline import (ENCODED_COLUMNS, clean_dataset, prepare_model_data, numeric_columns, iqr_bounds,
+                      remove_outliers, anova, encode_categoricals, split_data, scale_data, select_best_model)
+from synthetic_data import write_furniture_csv
+
+
+def measure(results, rows, stage, func):
+    """Run func, record its wall time and peak traced memory, and return its result."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.append({"rows": rows, "stage": stage, "seconds": round(seconds, 6), "peak_mb": round(peak / 2 ** 20, 3)})
+    print(f"{rows:>10} rows  {stage:<16} {seconds:9.3f}s  {peak / 2 ** 20:9.1f} MB")
+    return value
+
+
+def benchmark_size(rows, target="price", features=("rate", "delivery", "sale"), n_jobs=-1, seed=0):
+    results = []
+    # Written to disk in chunks, so 10M-row datasets never exist as one in-memory CSV string
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = write_furniture_csv(os.path.join(tmp_dir, "furniture.csv"), rows, seed=seed)
+        raw = measure(results, rows, "read_csv", lambda: pd.read_csv(csv_path))
+    data = measure(results, rows, "clean_dataset", lambda: clean_dataset(raw))
+    # encode_categoricals works in place, so it gets its own copy (made outside the timing)
+    unencoded = data.copy()
+    measure(results, rows, "label_encoding", lambda: encode_categoricals(unencoded, ENCODED_COLUMNS))
+    del unencoded
+
+    def iqr_filter():
+        data_cleaned = prepare_model_data(data)
+        lower_bound, upper_bound = iqr_bounds(numeric_columns(data_cleaned.drop(columns=['rate'])))
+        return remove_outliers(data_cleaned, lower_bound, upper_bound)
+
+    final_data = measure(results, rows, "iqr_filter", iqr_filter)
+    measure(results, rows, "correlation", lambda: numeric_columns(final_data).corr())
+    measure(results, rows, "anova", lambda: anova(final_data, ["furniture", "type"], target))
+
+    final_data = encode_categoricals(final_data)
+    X, y, X_train, X_test, y_train, y_test = split_data(final_data, features, target)
+    scaler, X_train_scaled, X_test_scaled = measure(results, rows, "scale_data", lambda: scale_data(X_train, X_test))
+
+    trained_models, model_performance = measure(
+        results, rows, "train_models",
+        lambda: train_models(X_train_scaled, y_train, X_test_scaled, y_test, build_candidate_models(), n_jobs=n_jobs))
+    for name, metrics in model_performance.items():
+        results.append({"rows": rows, "stage": f"fit:{name}", "seconds": round(metrics["Fit Time (s)"], 6), "peak_mb": None})
+
+    best_model = trained_models[select_best_model(model_performance)]
+    measure(results, rows, "predict", lambda: best_model.predict(X_test_scaled))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage on synthetic furniture data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="dataset sizes to benchmark (10k to 10M rows)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are written to")
+    parser.add_argument("--compare", default=None, help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown factor reported as a regression, default 1.25")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="worker processes used by train_models")
+    args = parser.parse_args(argv)
+
+    results = []
+    for rows in args.rows:
+        results.extend(benchmark_size(rows, n_jobs=args.n_jobs))
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold, key=("rows", "stage")):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# Run metadata and regression checks shared by the benchmarks.
+#
+# Only the standard library is imported here: the cold-start benchmark must be able to record
+# its environment without loading the packages whose import time it measures.
+import platform
+import subprocess
+from datetime import datetime, timezone
+from importlib import metadata
+
+PACKAGES = ("numpy", "pandas", "scikit-learn", "streamlit")
+
+
+def package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment():
+    """Timestamp, git commit, Python, platform and installed package versions of this run."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **{package: package_version(package) for package in PACKAGES},
+    }
+
+
+def compare(results, baseline, threshold, key=("stage",)):
+    """Print records that got slower than threshold times the baseline and return how many did.
+
+    Records are matched to the baseline on the fields in key, e.g. key=("rows", "stage").
+    """
+    previous = {tuple(r[field] for field in key): r["seconds"] for r in baseline["results"]}
+    regressions = 0
+    for record in results:
+        before = previous.get(tuple(record[field] for field in key))
+        if before and before > 0.01 and record["seconds"] > threshold * before:
+            regressions += 1
+            label = " ".join(str(record[field]) for field in key)
+            print(f"REGRESSION {label}: {before:.3f}s -> {record['seconds']:.3f}s")
+    return regressions
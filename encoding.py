@@ -0,0 +1,60 @@
+# Shared categorical encoding, built once per dataset.
+#
+# The sorted categories of each categorical column are stored in the frame itself as a
+# pandas 'category' dtype, so every stage (visual data, Steps 8 to 10 and the saved model)
+# reads the same int32 codes without sorting or hashing the strings again.
+import numpy as np
+import pandas as pd
+
+
+class CategoricalDictionary:
+    """Sorted categories of each categorical column; a value's code is its position."""
+
+    def __init__(self, categories):
+        self.categories = {col: pd.Index(values) for col, values in categories.items()}
+
+    @classmethod
+    def build(cls, data, columns):
+        categories = {}
+        for col in columns:
+            if col not in data.columns:
+                continue
+            column = data[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                categories[col] = column.cat.categories
+            else:
+                # Same order as LabelEncoder: the sorted distinct values
+                categories[col] = pd.Index(np.sort(column.dropna().unique().astype(str)))
+        return cls(categories)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Recover the dictionary from a frame whose categorical columns were already converted."""
+        return cls({col: data[col].cat.categories for col in data.columns
+                    if isinstance(data[col].dtype, pd.CategoricalDtype)})
+
+    def __contains__(self, col):
+        return col in self.categories
+
+    def apply(self, data):
+        """Store the dictionary's columns in data as compact 'category' columns (in place)."""
+        for col, categories in self.categories.items():
+            if col in data.columns:
+                data[col] = pd.Categorical(data[col].astype('string'), categories=categories)
+        return data
+
+    def codes(self, values, col):
+        """Return int32 codes for values of col; missing or unseen values get -1."""
+        if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.equals(self.categories[col]):
+            return values.cat.codes.to_numpy().astype('int32')
+        return self.categories[col].get_indexer(values.astype('string')).astype('int32')
+
+    def mapping(self, col):
+        return {value: code for code, value in enumerate(self.categories[col])}
+
+    def to_dict(self):
+        return {col: [str(value) for value in categories] for col, categories in self.categories.items()}
+
+    @classmethod
+    def from_dict(cls, categories):
+        return cls(categories)
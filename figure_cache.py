@@ -0,0 +1,62 @@
+# Cache of rendered figures as PNG bytes, keyed by the plotted data, column(s), chart type and styling.
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+
+def data_hash(data):
+    """Hash the values (not the identity) of a DataFrame or Series."""
+    hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    digest = hashlib.sha1(hashes.tobytes())
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr(list(data.columns)).encode())
+    return digest.hexdigest()
+
+
+def chart_key(chart_type, data, columns=(), **style):
+    if isinstance(columns, str):
+        columns = (columns,)
+    return chart_type, data_hash(data), tuple(columns), tuple(sorted(style.items()))
+
+
+class FigureCache:
+    """Least-recently-used store of PNG images, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def render(self, key, draw):
+        """Return the PNG for key, calling draw() to build the figure only on a miss."""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+
+        # Drawn outside the lock, so a slow chart does not hold up other sessions' cache hits
+        fig = draw()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        plt.close(fig)
+        image = buffer.getvalue()
+
+        with self._lock:
+            if key in self._images:
+                # Another session rendered the same chart meanwhile
+                self._size -= len(self._images[key])
+            self._images[key] = image
+            self._size += len(image)
+            while len(self._images) > self.max_entries or (self._size > self.max_bytes and len(self._images) > 1):
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+        return image
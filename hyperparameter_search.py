@@ -0,0 +1,154 @@
+# Budgeted, resumable hyperparameter search for the candidate regressors.
+#
+# Each model family is searched with successive halving: many random candidates are scored
+# on a small sample of the rows and only the best third move on to three times as many rows.
+# The search runs in rounds with a new random seed each; every finished round is saved
+# per dataset, target and feature set, so a repeated search continues with new candidates
+# instead of scoring the same ones again. Rounds stop once the wall-clock budget is spent.
+import hashlib
+import os
+import time
+import warnings
+from itertools import product
+
+import joblib
+from scipy.stats import loguniform, randint
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.model_selection import HalvingRandomSearchCV
+
+from model_registry import hyperparameter_signature
+
+# Search space of each family in build_candidate_models()
+SEARCH_SPACES = {
+    "Linear Regression": {"fit_intercept": [True, False], "positive": [False, True]},
+    "Decision Tree Regressor": {"max_depth": [None, 4, 6, 8, 12, 16, 24], "min_samples_leaf": randint(1, 50),
+                                "min_samples_split": randint(2, 50)},
+    "Random Forest Regressor": {"n_estimators": [25, 50, 100], "max_depth": [None, 8, 12, 16, 24],
+                                "min_samples_leaf": randint(1, 20), "max_features": [1.0, "sqrt", 0.5]},
+    "KNN Regressor": {"n_neighbors": randint(2, 50), "weights": ["uniform", "distance"], "p": [1, 2]},
+    "SVM Regressor": {"C": loguniform(1e-2, 1e3), "epsilon": loguniform(1e-3, 1e0), "gamma": ["scale", "auto"]},
+    # Scalable variants used on large training sets
+    "Histogram Gradient Boosting Regressor": {"learning_rate": loguniform(1e-2, 3e-1), "max_iter": [100, 200, 400],
+                                              "max_leaf_nodes": randint(15, 64), "min_samples_leaf": randint(10, 100),
+                                              "l2_regularization": loguniform(1e-4, 1e1)},
+    "Approximate SVM Regressor": {"nystroem__gamma": loguniform(1e-2, 1e1), "linearsvr__C": loguniform(1e-2, 1e3),
+                                  "linearsvr__epsilon": loguniform(1e-3, 1e0)},
+}
+CANDIDATES_PER_ROUND = 18
+MAX_ROUNDS = 8
+# The last halving iteration scores the survivors on at most this many rows
+MAX_SEARCH_ROWS = 50_000
+
+
+def search_key(dataset_key, target, selected_features, model_name, model, **details):
+    """Key of one family's search, e.g. search_key(..., test_size=0.2)."""
+    description = repr((dataset_key, target, tuple(selected_features), hyperparameter_signature({model_name: model}),
+                        repr(SEARCH_SPACES.get(model_name)), sorted(details.items())))
+    return hashlib.sha256(description.encode()).hexdigest()
+
+
+def grid_size(space):
+    """Number of distinct candidates when every parameter is a list, otherwise None (unbounded)."""
+    if not all(isinstance(values, list) for values in space.values()):
+        return None
+    return len(list(product(*space.values())))
+
+
+class SearchCache:
+    """Search state of each family on disk, one joblib file per search key."""
+
+    def __init__(self, cache_dir=".search_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.joblib")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return {"rounds": 0, "results": [], "seconds": 0.0}
+        return joblib.load(path)
+
+    def put(self, key, state):
+        tmp_path = self._path(key) + ".tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, self._path(key))
+
+
+def search_round(model, space, X_train, y_train, round_index, n_jobs=-1, cv=3):
+    """Run one successive-halving round and return [{"params", "score"}] of the finalists."""
+    search = HalvingRandomSearchCV(
+        clone(model), space, n_candidates=CANDIDATES_PER_ROUND, factor=3, resource="n_samples", min_resources="exhaust",
+        max_resources=min(len(X_train), MAX_SEARCH_ROWS), cv=cv, scoring="neg_mean_squared_error",
+        random_state=round_index, n_jobs=n_jobs, refit=False, error_score=float("nan"))
+    with warnings.catch_warnings():
+        # Small grids cannot fill a round, and some candidates fail on the smallest samples
+        warnings.simplefilter("ignore")
+        search.fit(X_train, y_train)
+
+    last_iteration = search.cv_results_["iter"].max()
+    return [{"params": params, "score": score}
+            for params, score, iteration in zip(search.cv_results_["params"], search.cv_results_["mean_test_score"],
+                                                search.cv_results_["iter"])
+            if iteration == last_iteration]
+
+
+def best_result(state):
+    scored = [result for result in state["results"] if result["score"] == result["score"]]  # skip NaN
+    return max(scored, key=lambda result: result["score"]) if scored else None
+
+
+def is_exhausted(state, space):
+    size = grid_size(space)
+    if state["rounds"] >= MAX_ROUNDS:
+        return True
+    return size is not None and state["rounds"] > 0 and size <= CANDIDATES_PER_ROUND
+
+
+def tune_models(X_train, y_train, models, dataset_key, target, selected_features, time_budget=60.0, n_jobs=-1,
+                cache=None, **details):
+    """Search every family in models for up to time_budget seconds and return (tuned_models, summary).
+
+    Families take turns one round at a time, those with the fewest rounds and then the least search time
+    first, so every family is searched before any is searched again. A round that starts inside the
+    budget is allowed to finish.
+    tuned_models holds fresh estimators set to each family's best parameters so far. summary only holds the
+    families with at least one finished round; the others keep their default hyperparameters.
+    """
+    cache = SearchCache() if cache is None else cache
+    keys = {name: search_key(dataset_key, target, selected_features, name, model, **details)
+            for name, model in models.items()}
+    states = {name: cache.get(key) for name, key in keys.items()}
+    deadline = time.perf_counter() + time_budget
+
+    while time.perf_counter() < deadline:
+        pending = [name for name in models
+                   if name in SEARCH_SPACES and not is_exhausted(states[name], SEARCH_SPACES[name])]
+        if not pending:
+            break
+        name = min(pending, key=lambda name: (states[name]["rounds"], states[name]["seconds"]))
+        state = states[name]
+        start = time.perf_counter()
+        state["results"].extend(search_round(models[name], SEARCH_SPACES[name], X_train, y_train, state["rounds"],
+                                             n_jobs))
+        state["rounds"] += 1
+        state["seconds"] += time.perf_counter() - start
+        cache.put(keys[name], state)
+
+    tuned_models = {}
+    summary = {}
+    for name, model in models.items():
+        best = best_result(states[name])
+        tuned_models[name] = clone(model).set_params(**best["params"]) if best else clone(model)
+        if states[name]["rounds"] == 0:
+            continue
+        summary[name] = {
+            "Best CV MSE": -best["score"] if best else float("nan"),
+            "Best Parameters": best["params"] if best else {},
+            "Rounds": states[name]["rounds"],
+            "Finalists": len(states[name]["results"]),
+            "Search Time (s)": states[name]["seconds"],
+        }
+    return tuned_models, summary
@@ -0,0 +1,240 @@
+# Out-of-core training for CSV files larger than memory.
+#
+# The file is read in chunks on every pass and never held in memory as a whole:
+#   1. the outlier bounds of the numeric columns and the categories of the categorical
+#      columns are collected,
+#   2. the StandardScalers of the features and of the target are fitted on the training
+#      rows with partial_fit,
+#   3. every incremental regressor is trained with partial_fit, chunk by chunk, for a
+#      number of epochs, and
+#   4. the held-out rows are scored, accumulating MSE, R2 and MAE as they stream past.
+# Each row's train/test assignment is drawn from a generator seeded with its chunk's
+# position, so every pass sees the same split without storing it. Unlike the in-memory
+# pipeline, duplicate rows are kept (as on the app's streamed statistics path).
+#
+# Example:
+#     python incremental_training.py history.csv --target price --features rate delivery sale --epochs 3
+import argparse
+import hashlib
+import time
+
+import numpy as np
+from sklearn.linear_model import SGDRegressor
+from sklearn.neural_network import MLPRegressor
+from sklearn.preprocessing import StandardScaler
+
+from encoding import CategoricalDictionary
+from model_bundle import bundle_version, save_bundle
+from model_training import StandardizedTargetRegressor
+from pipeline import (CATEGORICAL_COLUMNS, build_bundle, drop_unused_columns, encode_categoricals, parse_sale,
+                      remove_outliers, select_best_model)
+from streaming_stats import CHUNK_SIZE, StreamingProfile, read_csv_chunks
+
+
+def build_incremental_models():
+    """Candidate regressors that can be trained one chunk at a time with partial_fit."""
+    return {
+        "SGD Regressor": SGDRegressor(random_state=0),
+        "SGD Huber Regressor": SGDRegressor(loss="huber", random_state=0),
+        "Linear SVR (SGD)": SGDRegressor(loss="epsilon_insensitive", epsilon=0.0, random_state=0),
+        "MLP Regressor": MLPRegressor(hidden_layer_sizes=(32,), random_state=0),
+    }
+
+
+def file_hash(filename, block_size=2 ** 20):
+    """Same digest as ingestion_cache.content_hash of the file's bytes, read block by block."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def holdout_mask(n_rows, chunk_index, test_size, seed=42):
+    """True for the rows of a chunk held out for evaluation, the same on every pass."""
+    return np.random.default_rng([seed, chunk_index]).random(n_rows) < test_size
+
+
+def prepare_chunk(chunk):
+    return parse_sale(drop_unused_columns(chunk))
+
+
+class StreamedRegressionMetrics:
+    """MSE, R2 and MAE accumulated over batches of predictions."""
+
+    def __init__(self):
+        self.count = 0
+        self.shift = None
+        self.sum_sq_error = 0.0
+        self.sum_abs_error = 0.0
+        self.sum_y = 0.0
+        self.sum_y_sq = 0.0
+
+    def update(self, y_true, y_pred):
+        if len(y_true) == 0:
+            return
+        if self.shift is None:
+            # y is shifted by the first batch's mean so the sums of squares stay well conditioned
+            self.shift = float(np.mean(y_true))
+        error = y_true - y_pred
+        shifted = y_true - self.shift
+        self.count += len(y_true)
+        self.sum_sq_error += float(error @ error)
+        self.sum_abs_error += float(np.abs(error).sum())
+        self.sum_y += float(shifted.sum())
+        self.sum_y_sq += float(shifted @ shifted)
+
+    def results(self):
+        if self.count == 0:
+            return {"MSE": np.nan, "R2 Score": np.nan, "MAE": np.nan}
+        total = self.sum_y_sq - self.sum_y ** 2 / self.count
+        return {
+            "MSE": self.sum_sq_error / self.count,
+            "R2 Score": 1 - self.sum_sq_error / total if total > 0 else np.nan,
+            "MAE": self.sum_abs_error / self.count,
+        }
+
+
+def scan_csv(filename, categorical_columns=CATEGORICAL_COLUMNS, chunksize=CHUNK_SIZE, schema=None,
+             keep_columns=("rate",)):
+    """First pass: return (model columns, outlier bounds, categorical dictionary) of a CSV.
+
+    The model columns are the numeric and categorical columns, in file order.
+    """
+    profile = StreamingProfile()
+    categories = {col: set() for col in categorical_columns}
+    columns = None
+    for chunk in read_csv_chunks(filename, chunksize, schema, prepare_chunk):
+        columns = list(chunk.columns) if columns is None else columns
+        profile.update(chunk)
+        for col in categories:
+            if col in chunk.columns:
+                categories[col].update(chunk[col].dropna().astype(str).unique())
+
+    bounded = [col for col in profile.columns if col not in keep_columns]
+    lower_bound, upper_bound = profile.iqr_bounds(bounded)
+    # Same order as CategoricalDictionary.build: the sorted distinct values
+    dictionary = CategoricalDictionary({col: sorted(values) for col, values in categories.items()
+                                        if col in (columns or [])})
+    model_columns = [col for col in columns or [] if col in profile.columns or col in dictionary]
+    return model_columns, (lower_bound, upper_bound), dictionary
+
+
+def model_chunks(filename, features, target, bounds, dictionary, test_size=0.2, chunksize=CHUNK_SIZE, schema=None,
+                 seed=42):
+    """Yield (chunk_index, X, y, holdout) of every chunk with outliers removed and categories encoded."""
+    lower_bound, upper_bound = bounds
+    for chunk_index, chunk in enumerate(read_csv_chunks(filename, chunksize, schema, prepare_chunk)):
+        # The split is drawn before outlier removal so it does not depend on the bounds
+        holdout = holdout_mask(len(chunk), chunk_index, test_size, seed)
+        kept = remove_outliers(chunk, lower_bound, upper_bound)
+        holdout = holdout[chunk.index.get_indexer(kept.index)]
+        kept = encode_categoricals(kept, list(dictionary.categories), dictionary=dictionary)
+        # The features stay a DataFrame so the scaler keeps their names, as in the in-memory pipeline
+        yield chunk_index, kept[list(features)].astype(float), kept[target].to_numpy(dtype=float), holdout
+
+
+def train_incremental(filename, target="price", selected_features=None, test_size=0.2, chunksize=CHUNK_SIZE,
+                      epochs=3, models=None, categorical_columns=CATEGORICAL_COLUMNS, model_filename=None, seed=42):
+    """Train incremental regressors on a CSV in chunks and return a dictionary of the results.
+
+    Only one chunk is in memory at a time. The best model by held-out MSE is bundled with the
+    incrementally fitted scaler and saved to model_filename (unless that version is already saved).
+    """
+    models = build_incremental_models() if models is None else models
+    dataset_key = file_hash(filename)
+
+    columns, bounds, dictionary = scan_csv(filename, categorical_columns, chunksize)
+    if selected_features is None:
+        selected_features = [col for col in columns if col != target]
+
+    def chunks():
+        return model_chunks(filename, selected_features, target, bounds, dictionary, test_size, chunksize, seed=seed)
+
+    scaler = StandardScaler()
+    target_scaler = StandardScaler()
+    train_rows = test_rows = 0
+    for _, X, y, holdout in chunks():
+        train_rows += int((~holdout).sum())
+        test_rows += int(holdout.sum())
+        if (~holdout).any():
+            scaler.partial_fit(X[~holdout])
+            target_scaler.partial_fit(y[~holdout].reshape(-1, 1))
+    models = {name: StandardizedTargetRegressor(model, target_scaler.mean_[0], target_scaler.scale_[0])
+              for name, model in models.items()}
+
+    fit_time = dict.fromkeys(models, 0.0)
+    for epoch in range(epochs):
+        for chunk_index, X, y, holdout in chunks():
+            if not (~holdout).any():
+                continue
+            # Rows are shuffled within the chunk, so a file sorted by date or price does not bias each update
+            order = np.random.default_rng([seed, chunk_index, epoch]).permutation(int((~holdout).sum()))
+            X_train = scaler.transform(X[~holdout])[order]
+            y_train = y[~holdout][order]
+            for name, model in models.items():
+                start = time.perf_counter()
+                model.partial_fit(X_train, y_train)
+                fit_time[name] += time.perf_counter() - start
+
+    metrics = {name: StreamedRegressionMetrics() for name in models}
+    predict_time = dict.fromkeys(models, 0.0)
+    for _, X, y, holdout in chunks():
+        if not holdout.any():
+            continue
+        X_test = scaler.transform(X[holdout])
+        for name, model in models.items():
+            start = time.perf_counter()
+            y_pred = model.predict(X_test)
+            predict_time[name] += time.perf_counter() - start
+            metrics[name].update(y[holdout], y_pred)
+
+    model_performance = {name: {**metrics[name].results(), "Fit Time (s)": fit_time[name],
+                                "Predict Time (s)": predict_time[name]}
+                         for name in models}
+    best_model_name = select_best_model(model_performance)
+    version = bundle_version(dataset_key, target, selected_features, test_size, best_model_name,
+                             models[best_model_name], out_of_core=True, epochs=epochs, chunksize=chunksize)
+    bundle = build_bundle(models[best_model_name], scaler, selected_features, target, version, best_model_name,
+                          dictionary, model_performance[best_model_name])
+    bundle_written = save_bundle(bundle, model_filename) if model_filename is not None else False
+
+    return {
+        "dataset_key": dataset_key,
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "target": target,
+        "selected_features": list(selected_features),
+        "model_performance": model_performance,
+        "best_model_name": best_model_name,
+        "bundle": bundle,
+        "bundle_written": bundle_written,
+        "model_filename": model_filename,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train price models on a CSV larger than memory, chunk by chunk.")
+    parser.add_argument("source", help="CSV file to train on")
+    parser.add_argument("--target", default="price", help="target (dependent) variable, default: price")
+    parser.add_argument("--features", nargs="+", default=None,
+                        help="predictor variables, default: every numeric and categorical column except the target")
+    parser.add_argument("--test-size", type=float, default=0.2, help="fraction of rows held out for evaluation")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows read and trained on at a time")
+    parser.add_argument("--epochs", type=int, default=3, help="passes over the training rows")
+    parser.add_argument("--output", default=None, help="model bundle file, default: <source>_incremental.joblib")
+    args = parser.parse_args(argv)
+
+    output = args.output or args.source.rsplit(".", 1)[0] + "_incremental.joblib"
+    result = train_incremental(args.source, args.target, args.features, args.test_size, args.chunksize, args.epochs,
+                               model_filename=output)
+    print(f"Trained on {result['train_rows']:,} rows, evaluated on {result['test_rows']:,} held-out rows")
+    for name, metrics in result["model_performance"].items():
+        print(f"{name:<24} MSE {metrics['MSE']:12.2f}  R2 {metrics['R2 Score']:6.3f}  MAE {metrics['MAE']:9.2f}  "
+              f"fit {metrics['Fit Time (s)']:7.2f}s")
+    action = "saved to" if result["bundle_written"] else "unchanged in"
+    print(f"Best model {result['best_model_name']} {action} {output}")
+
+
+if __name__ == "__main__":
+    main()
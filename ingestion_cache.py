@@ -0,0 +1,103 @@
+# Content-hash keyed cache of parsed and cleaned datasets, in memory and as Parquet files on disk.
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def content_hash(file_bytes):
+    """Return the hex digest used as the cache key for a file's raw bytes."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class IngestionCache:
+    """Two-tier (memory, then Parquet on disk) LRU cache of cleaned DataFrames."""
+
+    def __init__(self, cache_dir=".ingestion_cache", max_memory_items=8, max_disk_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_enabled = True
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def get(self, key):
+        # Memory tier
+        with self._lock:
+            frame = self._memory.get(key)
+            if frame is not None:
+                self._memory.move_to_end(key)
+                return frame
+
+        # Disk tier; another writer's eviction may remove the file at any point, which is a miss
+        path = self._path(key)
+        if not self.disk_enabled:
+            return None
+        try:
+            frame = pd.read_parquet(path)
+            os.utime(path)  # mark as recently used for eviction
+        except FileNotFoundError:
+            return None
+        except ImportError:
+            self.disk_enabled = False
+            return None
+        self._remember(key, frame)
+        return frame
+
+    def put(self, key, frame):
+        self._remember(key, frame)
+        if not self.disk_enabled:
+            return
+
+        # Write to a temporary file of this writer's own first, so a crash never leaves a half-written
+        # entry and concurrent writers of the same key never move each other's file
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except ImportError:
+            # No Parquet engine (pyarrow/fastparquet) installed, keep the memory tier only
+            self.disk_enabled = False
+            return
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict_disk()
+
+    def _remember(self, key, frame):
+        with self._lock:
+            self._memory[key] = frame
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".parquet"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue  # already evicted by another writer
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Drop the least recently used files until we are back under the size cap
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
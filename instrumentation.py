@@ -0,0 +1,106 @@
+# Per-step timing and memory metrics.
+#
+# StepMetrics.start() closes the step before it, so the app only marks where each step
+# begins. Every step records its wall time, CPU time, RSS change, growth of the peak RSS
+# and the number of rows it worked on. Records can be appended to a JSON-lines file or
+# written in the Prometheus text format for a textfile collector to scrape.
+import json
+import os
+import time
+
+import pandas as pd
+
+from memory_budget import process_memory_mb
+
+try:
+    import resource
+except ImportError:  # not available on Windows, the peak RSS growth is then left empty
+    resource = None
+
+METRICS_FILENAME = "app_metrics.jsonl"
+PROMETHEUS_FILENAME = "app_metrics.prom"
+METRIC_COLUMNS = ["Step", "Wall Time (s)", "CPU Time (s)", "RSS Delta (MB)", "Peak RSS Growth (MB)", "Rows"]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _delta(after, before):
+    return None if after is None or before is None else after - before
+
+
+class StepMetrics:
+    """Wall time, CPU time, memory and row counts of consecutive steps of one run."""
+
+    def __init__(self, **labels):
+        self.labels = labels
+        self.records = []
+        self._current = None
+
+    def start(self, step, rows=None):
+        """Finish the running step, if any, and start measuring step."""
+        self.finish()
+        self._current = {"step": step, "rows": rows, "wall": time.perf_counter(), "cpu": time.process_time(),
+                         "rss": process_memory_mb(), "peak": peak_rss_mb()}
+
+    def finish(self, rows=None):
+        """Record the running step; rows replaces its row count when only known at the end."""
+        if self._current is None:
+            return
+        current, self._current = self._current, None
+        self.add(current["step"], time.perf_counter() - current["wall"], time.process_time() - current["cpu"],
+                 _delta(process_memory_mb(), current["rss"]), _delta(peak_rss_mb(), current["peak"]),
+                 current["rows"] if rows is None else rows)
+
+    def add(self, step, wall_time, cpu_time=None, rss_delta_mb=None, peak_growth_mb=None, rows=None):
+        """Record a step measured elsewhere, e.g. a model fit timed inside a worker process."""
+        self.records.append({"Step": step, "Wall Time (s)": wall_time, "CPU Time (s)": cpu_time,
+                             "RSS Delta (MB)": rss_delta_mb, "Peak RSS Growth (MB)": peak_growth_mb, "Rows": rows})
+
+    def add_model_fits(self, model_performance, rows):
+        for name, metrics in model_performance.items():
+            self.add(f"Fit: {name}", metrics["Fit Time (s)"], rows=rows)
+            self.add(f"Predict: {name}", metrics["Predict Time (s)"])
+
+    def report(self):
+        return pd.DataFrame(self.records, columns=METRIC_COLUMNS)
+
+    def append_jsonl(self, filename):
+        """Append one JSON line per step, tagged with the labels and a timestamp."""
+        timestamp = time.time()
+        with open(filename, "a") as f:
+            for record in self.records:
+                f.write(json.dumps({"timestamp": timestamp, **self.labels, **record}, default=str) + "\n")
+        return filename
+
+    def prometheus_text(self, prefix="furniture_app_step"):
+        """The records as Prometheus gauges, one sample per step and measurement."""
+        gauges = {"Wall Time (s)": "wall_seconds", "CPU Time (s)": "cpu_seconds",
+                  "RSS Delta (MB)": "rss_delta_megabytes", "Peak RSS Growth (MB)": "peak_rss_growth_megabytes",
+                  "Rows": "rows"}
+        lines = []
+        for column, suffix in gauges.items():
+            lines.append(f"# TYPE {prefix}_{suffix} gauge")
+            for record in self.records:
+                if record[column] is None:
+                    continue
+                labels = {**self.labels, "step": record["Step"]}
+                label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+                lines.append(f"{prefix}_{suffix}{{{label_text}}} {record[column]}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename):
+        # Replaced in one step so a scraper never reads a half-written file
+        tmp_path = filename + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, filename)
+        return filename
@@ -0,0 +1,89 @@
+# Memory-lean helpers: numeric downcasting, copy-free frames and a peak-memory budget.
+#
+# Copy-on-Write lets the pipeline's derived frames (visual data, outlier-filtered data,
+# correlation frames) share column buffers with the frame they came from until a column
+# is actually changed, and the budget reports the first stage that goes over the limit.
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # optional, without it only the tracked frames are counted
+    psutil = None
+
+
+class MemoryBudgetExceeded(MemoryError):
+    def __init__(self, stage, used_mb, limit_mb):
+        super().__init__(f"Stage '{stage}' used {used_mb:.0f} MB, over the {limit_mb:.0f} MB memory budget.")
+        self.stage = stage
+        self.used_mb = used_mb
+        self.limit_mb = limit_mb
+
+
+def enable_copy_on_write():
+    # Derived frames share buffers with their parent until one of them is modified
+    pd.set_option("mode.copy_on_write", True)
+
+
+def downcast_numeric(data):
+    """Downcast numeric columns in place to the smallest dtype that holds their values exactly."""
+    for col in data.select_dtypes(include=['integer']).columns:
+        kind = 'unsigned' if len(data) and data[col].min() >= 0 else 'integer'
+        data[col] = pd.to_numeric(data[col], downcast=kind)
+    for col in data.select_dtypes(include=['floating']).columns:
+        values = data[col].to_numpy()
+        with np.errstate(over='ignore'):
+            narrowed = values.astype(np.float32)
+        # Only keep float32 when every value, NaN included, round-trips unchanged
+        if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+            data[col] = narrowed
+    return data
+
+
+def frame_memory_mb(*frames):
+    # Numpy columns shared between frames through Copy-on-Write point at the same buffer and are counted once
+    seen = set()
+    total = 0
+    for frame in frames:
+        for col in frame.columns:
+            values = frame[col].values
+            if isinstance(values, np.ndarray):
+                key = (values.__array_interface__["data"][0], values.nbytes)
+                if key in seen:
+                    continue
+                seen.add(key)
+            total += frame[col].memory_usage(deep=True, index=False)
+    return total / 2 ** 20
+
+
+def process_memory_mb():
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+
+class MemoryBudget:
+    """Records memory use after each stage and raises MemoryBudgetExceeded past limit_mb.
+
+    Process RSS is used when psutil is installed, otherwise the size of the live frames.
+    """
+
+    def __init__(self, limit_mb=None):
+        self.limit_mb = limit_mb
+        self.peak_mb = 0.0
+        self.stages = []
+
+    def checkpoint(self, stage, *frames):
+        used_mb = process_memory_mb()
+        source = "process RSS"
+        if used_mb is None:
+            used_mb = frame_memory_mb(*frames)
+            source = "live frames"
+        self.peak_mb = max(self.peak_mb, used_mb)
+        self.stages.append({"Stage": stage, "Memory (MB)": round(used_mb, 1), "Measured": source})
+        if self.limit_mb is not None and used_mb > self.limit_mb:
+            raise MemoryBudgetExceeded(stage, used_mb, self.limit_mb)
+        return used_mb
+
+    def report(self):
+        return pd.DataFrame(self.stages)
@@ -0,0 +1,111 @@
+# Versioned model bundle: everything needed to turn raw feature rows into a prediction.
+#
+# The estimator is saved together with its fitted scaler, category codes, feature order,
+# target transform and training metrics. The version is a hash of the training inputs, so
+# an unchanged configuration is neither retrained nor rewritten. The bundle is stored
+# uncompressed, so joblib can memory-map the numpy arrays an estimator keeps as attributes:
+# a KNN model's training set and KD-tree and the scaler's statistics open without being
+# copied, and processes loading the same file share their pages. Tree models (decision
+# trees, forests, gradient boosting) still load into memory, because sklearn copies each
+# tree's node and value arrays into its own buffers when it is unpickled.
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from encoding import CategoricalDictionary
+from model_registry import hyperparameter_signature
+
+BUNDLE_FILENAME = "best_model.joblib"
+
+# Inverse of each supported target transform, applied to the model's raw predictions
+TARGET_TRANSFORMS = {None: None, "log1p": np.expm1}
+
+
+def bundle_version(dataset_key, target, selected_features, test_size, model_name, model, **details):
+    """Hash of everything that decides the retrained model, e.g. bundle_version(..., lean=True)."""
+    description = repr((dataset_key, target, tuple(selected_features), round(float(test_size), 4),
+                        hyperparameter_signature({model_name: model}), sorted(details.items())))
+    return hashlib.sha256(description.encode()).hexdigest()[:16]
+
+
+class ModelBundle:
+    """A fitted estimator with the preprocessing it was trained with."""
+
+    def __init__(self, model, scaler, feature_names, target, version, model_name=None, categories=None,
+                 target_transform=None, metrics=None):
+        if target_transform not in TARGET_TRANSFORMS:
+            raise ValueError(f"Unsupported target transform '{target_transform}'")
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = list(feature_names)
+        self.target = target
+        self.version = version
+        self.model_name = model_name
+        self.categories = categories or {}
+        self.target_transform = target_transform
+        self.metrics = metrics or {}
+
+    @property
+    def dictionary(self):
+        return CategoricalDictionary.from_dict(self.categories)
+
+    def encode(self, frame, dictionary=None):
+        """Return the feature matrix of frame: category codes, missing values as 0, training column order."""
+        dictionary = self.dictionary if dictionary is None else dictionary
+        missing = [col for col in self.feature_names if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Missing feature column(s): {', '.join(missing)}")
+        features = frame[self.feature_names].copy()
+        for col in self.feature_names:
+            if col in dictionary:
+                features[col] = dictionary.codes(features[col], col)
+        # Missing values were replaced with 0 before training
+        return features.fillna(0)
+
+    def predict(self, features):
+        """Predict the target for an encoded feature matrix, undoing the target transform."""
+        if not isinstance(features, pd.DataFrame):
+            features = pd.DataFrame(features, columns=self.feature_names)
+        predictions = self.model.predict(self.scaler.transform(features[self.feature_names]))
+        inverse = TARGET_TRANSFORMS[self.target_transform]
+        return predictions if inverse is None else inverse(predictions)
+
+
+def version_filename(filename):
+    return os.path.splitext(filename)[0] + ".version"
+
+
+def saved_version(filename=BUNDLE_FILENAME):
+    """Version of the bundle saved at filename, or None if there is none."""
+    if not os.path.exists(filename) or not os.path.exists(version_filename(filename)):
+        return None
+    with open(version_filename(filename)) as f:
+        return f.read().strip()
+
+
+def save_bundle(bundle, filename=BUNDLE_FILENAME):
+    """Write bundle unless the same version is already saved; returns True when it was written."""
+    if saved_version(filename) == bundle.version:
+        return False
+    import joblib
+
+    # Written to a temporary file first so readers never open a half-written bundle
+    temporary = f"{filename}.tmp"
+    joblib.dump(bundle, temporary)
+    # The old version file goes first: a crash before the new one is written leaves the bundle unversioned
+    # (retrained on the next run) rather than labelled with the version it replaced
+    if os.path.exists(version_filename(filename)):
+        os.remove(version_filename(filename))
+    os.replace(temporary, filename)
+    with open(version_filename(filename), "w") as f:
+        f.write(bundle.version)
+    return True
+
+
+def load_bundle(filename=BUNDLE_FILENAME, mmap=True):
+    """Load a bundle, memory-mapping its plain numpy arrays read-only unless mmap is False."""
+    import joblib
+
+    return joblib.load(filename, mmap_mode="r" if mmap else None)
@@ -0,0 +1,48 @@
+# Registry of trained candidate models and their metrics, keyed by everything that decides the training result.
+import threading
+from collections import OrderedDict
+
+
+def hyperparameter_signature(models):
+    """Return a hashable description of every model's hyperparameters."""
+    return tuple(
+        (name, type(model).__name__, repr(sorted(model.get_params().items())))
+        for name, model in sorted(models.items())
+    )
+
+
+def registry_key(dataset_key, target, selected_features, test_size, models, **details):
+    """Key of one training configuration; details are the options that change the training data, e.g. lean=True."""
+    return (dataset_key, target, tuple(selected_features), round(float(test_size), 4), hyperparameter_signature(models),
+            tuple(sorted(details.items())))
+
+
+class ModelRegistry:
+    """Least-recently-used store of (trained_models, model_performance) pairs."""
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, trained_models, model_performance):
+        with self._lock:
+            self._entries[key] = (trained_models, model_performance)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
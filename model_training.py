@@ -0,0 +1,185 @@
+# Training and scoring of the candidate regression models.
+#
+# Each candidate is fitted and scored once, in its own worker process, and reports how
+# long its fit and predict calls took. Cross-validation spreads every (model, fold) pair
+# over the same process pool. Above configurable training-set sizes the families whose fit or
+# prediction cost grows too fast with the rows are replaced by scalable variants.
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin, clone
+from sklearn.kernel_approximation import Nystroem
+from sklearn.model_selection import KFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.svm import SVR, LinearSVR
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.metrics import mean_absolute_error
+
+
+# Training rows above which a family is replaced by its scalable variant. KNN has none: on these few
+# dense features algorithm="auto" already queries a KD-tree, so prediction stays logarithmic in the rows
+SCALE_THRESHOLDS = {
+    "Random Forest Regressor": 100_000,
+    "SVM Regressor": 50_000,
+}
+
+# Family: (variant name, variant factory, why the family does not scale)
+SCALABLE_VARIANTS = {
+    "Random Forest Regressor": ("Histogram Gradient Boosting Regressor", lambda: HistGradientBoostingRegressor(),
+                                "a forest of full-depth trees grows with rows times trees"),
+    "SVM Regressor": ("Approximate SVM Regressor",
+                      lambda: make_pipeline(Nystroem(n_components=300, random_state=0), LinearSVR(max_iter=5000)),
+                      "a kernel SVR fit grows quadratically or worse with rows"),
+}
+
+
+def scale_variants(n_rows, thresholds=None):
+    """Return {family: {"Variant", "Reason"}} for every family swapped at n_rows training rows.
+
+    thresholds overrides SCALE_THRESHOLDS per family; a threshold of None never swaps that family.
+    """
+    thresholds = {**SCALE_THRESHOLDS, **(thresholds or {})}
+    variants = {}
+    for family, (variant, _, why) in SCALABLE_VARIANTS.items():
+        threshold = thresholds.get(family)
+        if n_rows is not None and threshold is not None and n_rows > threshold:
+            variants[family] = {"Variant": variant,
+                                "Reason": f"{n_rows:,} training rows exceed the {threshold:,}-row threshold; {why}"}
+    return variants
+
+
+def build_candidate_models(n_rows=None, thresholds=None):
+    """The candidate regressors for a training set of n_rows, with scalable variants above the thresholds."""
+    models = {
+        "Linear Regression": LinearRegression(),
+        "Decision Tree Regressor": DecisionTreeRegressor(),
+        "Random Forest Regressor": RandomForestRegressor(),
+        "KNN Regressor": KNeighborsRegressor(),
+        "SVM Regressor": SVR()
+    }
+    swapped = scale_variants(n_rows, thresholds)
+    candidates = {}
+    for name, model in models.items():
+        if name in swapped:
+            # The variant takes the family's place under its own name, so reports show which one ran
+            name, factory, _ = SCALABLE_VARIANTS[name]
+            model = factory()
+        candidates[name] = model
+    return candidates
+
+
+class StandardizedTargetRegressor(RegressorMixin, BaseEstimator):
+    """An incremental regressor trained on the standardized target; predict() returns the original units.
+
+    SGD's step sizes and the Huber and epsilon-insensitive margins assume a target near unit scale.
+    """
+
+    def __init__(self, regressor, y_mean=0.0, y_scale=1.0):
+        self.regressor = regressor
+        self.y_mean = y_mean
+        self.y_scale = y_scale
+
+    def partial_fit(self, X, y):
+        self.regressor.partial_fit(X, (np.asarray(y) - self.y_mean) / self.y_scale)
+        return self
+
+    def predict(self, X):
+        return self.regressor.predict(X) * self.y_scale + self.y_mean
+
+
+def fit_and_score(name, model, X_train_scaled, y_train, X_test_scaled, y_test):
+    """Fit one model, score it on the test set and time both calls."""
+    start = time.perf_counter()
+    model.fit(X_train_scaled, y_train)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test_scaled)
+    predict_time = time.perf_counter() - start
+
+    metrics = {
+        "MSE": mean_squared_error(y_test, y_pred),
+        "R2 Score": r2_score(y_test, y_pred),
+        "MAE": mean_absolute_error(y_test, y_pred),
+        "Fit Time (s)": fit_time,
+        "Predict Time (s)": predict_time,
+    }
+    return name, model, metrics
+
+
+def train_models(X_train_scaled, y_train, X_test_scaled, y_test, models=None, n_jobs=-1):
+    """Fit and score every candidate concurrently across a process pool.
+
+    Returns the fitted models and their metrics, both keyed by model name.
+    """
+    if models is None:
+        models = build_candidate_models()
+
+    # loky runs each job in a separate process; large arrays are memory-mapped to the workers
+    results = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(fit_and_score)(name, model, X_train_scaled, y_train, X_test_scaled, y_test)
+        for name, model in models.items()
+    )
+
+    trained_models = {}
+    model_performance = {}
+    for name, model, metrics in results:
+        trained_models[name] = model
+        model_performance[name] = metrics
+    return trained_models, model_performance
+
+
+def make_folds(n_samples, n_splits=5, random_state=42):
+    """Return the (train_indices, test_indices) of each shuffled k-fold split."""
+    return list(KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(np.arange(n_samples)))
+
+
+def score_fold(name, model, X, y, train_index, test_index):
+    # The scaler is fitted on the training folds only, so the held-out fold stays unseen
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_index])
+    X_test = scaler.transform(X[test_index])
+    _, _, metrics = fit_and_score(name, clone(model), X_train, y[train_index], X_test, y[test_index])
+    return name, metrics
+
+
+def cross_validate_models(X, y, folds, models=None, n_jobs=-1):
+    """Score every candidate on every fold concurrently and summarize each model across folds.
+
+    Returns the mean and standard deviation of MSE, R2 and MAE and the mean fit and predict times per model.
+    """
+    if models is None:
+        models = build_candidate_models()
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    results = Parallel(n_jobs=n_jobs, backend="loky")(
+        delayed(score_fold)(name, model, X, y, train_index, test_index)
+        for name, model in models.items()
+        for train_index, test_index in folds
+    )
+
+    fold_metrics = {name: [] for name in models}
+    for name, metrics in results:
+        fold_metrics[name].append(metrics)
+
+    cv_performance = {}
+    for name, metrics in fold_metrics.items():
+        scores = {metric: np.array([fold[metric] for fold in metrics]) for metric in metrics[0]}
+        cv_performance[name] = {
+            "CV MSE Mean": scores["MSE"].mean(),
+            "CV MSE Std": scores["MSE"].std(),
+            "CV R2 Mean": scores["R2 Score"].mean(),
+            "CV R2 Std": scores["R2 Score"].std(),
+            "CV MAE Mean": scores["MAE"].mean(),
+            "CV MAE Std": scores["MAE"].std(),
+            "Fit Time (s)": scores["Fit Time (s)"].mean(),
+            "Predict Time (s)": scores["Predict Time (s)"].mean(),
+        }
+    return cv_performance
@@ -0,0 +1,344 @@
+# Headless furniture price pipeline.
+#
+# These functions are the steps of StreamlitSampleProject.py without any Streamlit calls,
+# so they can be imported, benchmarked, or run in batch by pipeline_cli.py. scikit-learn and
+# the training modules are imported by the functions that use them, so ingesting and
+# exploring a dataset does not pay for loading them.
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from anova_engine import one_way_anova
+from encoding import CategoricalDictionary
+from memory_budget import MemoryBudget, downcast_numeric
+from model_bundle import ModelBundle, bundle_version, load_bundle, save_bundle, saved_version
+from ingestion_cache import content_hash
+from type_inference import infer_schema, apply_schema
+
+# Columns that identify a listing rather than describe it
+UNUSED_COLUMNS = ("Unnamed: 0", "url")
+CATEGORICAL_COLUMNS = ("furniture", "type")
+# Columns stored as shared category codes, built once per dataset
+ENCODED_COLUMNS = CATEGORICAL_COLUMNS + ("url",)
+
+
+# Function to clean dataset by converting object columns to appropriate data types
+def clean_dataset(data, schema=None):
+    # Step 1: Decide each object column's type (numeric, datetime or string) from a sample of its values
+    if schema is None:
+        schema = infer_schema(data)
+
+    # Step 2: Convert each column with a single vectorized call, keeping it as a string if the full column disagrees with the sample
+    data = apply_schema(data, schema)
+
+    # Step 3: Return the cleaned dataset
+    return data
+
+
+def read_bytes(source):
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+# Version of parse_dataset's output; cached frames of another version are never served.
+# Bump it whenever the parsed frames change (2: categorical columns stored as 'category';
+# 3: lean frames only narrow float columns to float32 when that is exact).
+DATASET_FORMAT_VERSION = 3
+
+
+def parse_dataset(file_bytes, downcast=False):
+    """Parse, clean and categorize the bytes of one CSV (safe to call from worker threads)."""
+    data = categorize(clean_dataset(pd.read_csv(io.BytesIO(file_bytes))))
+    return downcast_numeric(data) if downcast else data
+
+
+def read_dataset(source):
+    """Read and clean a CSV from a path or file object, returning (dataset_key, data)."""
+    file_bytes = read_bytes(source)
+    return content_hash(file_bytes), parse_dataset(file_bytes)
+
+
+def read_datasets(sources, max_workers=None, downcast=False):
+    """Read and clean several CSVs at the same time, returning [(dataset_key, data)] in source order.
+
+    The C parser releases the GIL while tokenizing, so threads overlap the parsing of different files.
+    """
+    contents = [read_bytes(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(lambda file_bytes: parse_dataset(file_bytes, downcast), contents))
+    return [(content_hash(file_bytes), data) for file_bytes, data in zip(contents, frames)]
+
+
+def combined_key(dataset_keys, dedupe=True):
+    """Key of the union of several datasets; the order the files were given in does not matter."""
+    return content_hash(("union" + ("-dedupe" if dedupe else "") + ":" + ",".join(sorted(dataset_keys))).encode())
+
+
+def union_datasets(frames, dedupe=True):
+    """Stack cleaned datasets into one, aligning their columns and types.
+
+    Columns missing from a file are left empty, and a column typed differently across files is
+    typed again from the combined values. With dedupe, rows repeated across (or within) files
+    are kept once; the per-file row number in 'Unnamed: 0' is ignored when comparing rows.
+    """
+    # Category codes differ per file, so compare and stack the labels instead
+    frames = [frame.astype({col: 'string' for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)})
+              for frame in frames]
+    data = pd.concat(frames, join="outer", ignore_index=True, sort=False)
+    data = clean_dataset(data)
+    if dedupe:
+        data = data.drop_duplicates(subset=[col for col in data.columns if col != "Unnamed: 0"], ignore_index=True)
+    return categorize(data)
+
+
+def categorize(data, columns=ENCODED_COLUMNS):
+    """Build the dataset's categorical dictionary and store those columns as 'category' (in place)."""
+    return CategoricalDictionary.build(data, columns).apply(data)
+
+
+def parse_sale(frame):
+    # Remove the percentage sign from 'sale' so it can be treated as continuous
+    if 'sale' in frame.columns and not pd.api.types.is_numeric_dtype(frame['sale']):
+        frame['sale'] = frame['sale'].str.replace('%', '').astype(float)
+    return frame
+
+
+def drop_unused_columns(frame):
+    return frame.drop(columns=[col for col in UNUSED_COLUMNS if col in frame.columns])
+
+
+def encode_categoricals(frame, columns=CATEGORICAL_COLUMNS, log_price=False, dictionary=None):
+    """Replace the categorical columns with their int32 codes in place, optionally logging 'price'.
+
+    Columns already stored as 'category' reuse the dataset's dictionary, so every stage gets the same codes.
+    """
+    if dictionary is None:
+        dictionary = CategoricalDictionary.build(frame, columns)
+    for col in columns:
+        if col in frame.columns and col in dictionary:
+            frame[col] = dictionary.codes(frame[col], col)
+    if log_price:
+        frame['price'] = np.log1p(frame['price'])
+    return frame
+
+
+def build_visual_data(data_cleaned):
+    """Cleaned data for visualization: encoded categoricals, numeric 'sale' and logged 'price'."""
+    visual_data = data_cleaned.drop_duplicates()
+    visual_data = encode_categoricals(visual_data, ENCODED_COLUMNS, log_price=True)
+    return parse_sale(visual_data)
+
+
+def prepare_model_data(data):
+    """Drop duplicates and identifier columns and parse 'sale' (the data behind Steps 4 to 7)."""
+    data_cleaned = drop_unused_columns(data.drop_duplicates())
+    return parse_sale(data_cleaned)
+
+
+def iqr_bounds(numeric_cols, Q1=None, Q3=None, factor=1.5):
+    """Return the IQR outlier bounds of the numeric columns, optionally from precomputed quartiles."""
+    if Q1 is None:
+        Q1 = numeric_cols.quantile(0.25)
+    if Q3 is None:
+        Q3 = numeric_cols.quantile(0.75)
+    IQR = Q3 - Q1
+    return Q1 - factor * IQR, Q3 + factor * IQR
+
+
+def count_outliers(numeric_cols, lower_bound, upper_bound):
+    return ((numeric_cols < lower_bound) | (numeric_cols > upper_bound)).sum()
+
+
+def remove_outliers(data_cleaned, lower_bound, upper_bound, keep_columns=("rate",)):
+    """Drop rows with an outlier in any bounded column and replace missing values with 0.
+
+    Columns in keep_columns are left out of the outlier test and kept as they are.
+    """
+    columns = list(lower_bound.index)
+    outside = (data_cleaned[columns] < lower_bound) | (data_cleaned[columns] > upper_bound)
+    final_data = data_cleaned[~outside.any(axis=1)].drop(columns=[col for col in keep_columns if col in data_cleaned.columns])
+    for col in keep_columns:
+        if col in data_cleaned.columns:
+            final_data.insert(min(2, len(final_data.columns)), col, data_cleaned.loc[final_data.index, col], True)
+    # Only numeric columns are filled: category columns keep their missing values (code -1), and the string
+    # columns of streamed chunks, which are encoded later, cannot hold a 0
+    return final_data.fillna({col: 0 for col in numeric_columns(final_data).columns})
+
+
+def numeric_columns(frame):
+    return frame.select_dtypes(include=['number'])
+
+
+def classify_correlations(correlation_matrix, target):
+    """Split the correlations with target into strong, moderate and weak."""
+    target_correlations = correlation_matrix[target].drop(target)  # Drop correlation of target with itself
+    strength = target_correlations.abs()
+    return {
+        "all": target_correlations,
+        "strong": target_correlations[strength >= 0.7],
+        "moderate": target_correlations[(strength >= 0.3) & (strength < 0.7)],
+        "weak": target_correlations[strength < 0.3],
+    }
+
+
+def anova(final_data, categorical_columns, target):
+    """One-way ANOVA of target across the levels of each categorical column.
+
+    F and p come from grouped count, sum and sum-of-squares aggregates (see anova_engine.py).
+    """
+    return one_way_anova(final_data, categorical_columns, target)
+
+
+def scale_data(X_train, X_test):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    return scaler, X_train_scaled, X_test_scaled
+
+
+def split_data(final_data, selected_features, target, test_size=0.2):
+    """Return X, y and the train/test split used in Step 11."""
+    from sklearn.model_selection import train_test_split
+
+    X = final_data[list(selected_features)]
+    y = final_data[target]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+    return X, y, X_train, X_test, y_train, y_test
+
+
+def select_best_model(model_performance, metric="MSE"):
+    """Return the name of the model with the lowest value of metric."""
+    return min(model_performance, key=lambda x: model_performance[x][metric])
+
+
+def retrain_best_model(model, scaler, X, y):
+    """Fit fresh copies of the scaler and model on the entire dataset (Step 14), returning both."""
+    from sklearn.base import clone
+
+    best_model = clone(model)
+    full_scaler = clone(scaler)
+    best_model.fit(full_scaler.fit_transform(X), y)
+    return best_model, full_scaler
+
+
+def build_bundle(model, scaler, selected_features, target, version, model_name=None, categorical_dictionary=None,
+                 metrics=None):
+    """Wrap a retrained model with its scaler and the category codes of its features."""
+    categories = {}
+    if categorical_dictionary is not None:
+        categories = {col: values for col, values in categorical_dictionary.to_dict().items() if col in selected_features}
+    return ModelBundle(model, scaler, selected_features, target, version, model_name, categories, metrics=metrics)
+
+
+def default_features(final_data, target):
+    return [col for col in numeric_columns(final_data).columns if col != target]
+
+
+def run_pipeline(source, target="price", selected_features=None, test_size=0.2, categorical_columns=CATEGORICAL_COLUMNS,
+                 model_filename=None, n_jobs=-1, downcast=False, memory_budget=None, tune_budget=None, cv_folds=None,
+                 dedupe=True, scale_thresholds=None):
+    """Run Steps 1 to 14 on a CSV and return a dictionary of the results.
+
+    With downcast the numeric columns are narrowed on ingest, and a MemoryBudget raises
+    MemoryBudgetExceeded naming the first stage that goes over it. A list of sources is read
+    concurrently and trained on as one dataset, with rows repeated across files dropped when dedupe. With tune_budget the candidates'
+    hyperparameters are searched for that many seconds first, continuing any earlier search. With
+    cv_folds the best model is chosen by mean k-fold cross-validated MSE instead of the single split.
+    scale_thresholds overrides the training-set sizes above which families are swapped for scalable variants.
+    """
+    from hyperparameter_search import tune_models
+    from model_training import build_candidate_models, cross_validate_models, make_folds, scale_variants, train_models
+
+    if memory_budget is None:
+        memory_budget = MemoryBudget()
+    if isinstance(source, (list, tuple)):
+        datasets = read_datasets(source)
+        dataset_key = combined_key([key for key, _ in datasets], dedupe)
+        data = union_datasets([frame for _, frame in datasets], dedupe)
+    else:
+        dataset_key, data = read_dataset(source)
+    if downcast:
+        data = downcast_numeric(data)
+    memory_budget.checkpoint("Ingest", data)
+
+    # Steps 4 to 7: drop identifiers, remove outliers (except 'rate') and fill missing values
+    data_cleaned = prepare_model_data(data)
+    numeric_cols = numeric_columns(data_cleaned.drop(columns=['rate'], errors='ignore'))
+    lower_bound, upper_bound = iqr_bounds(numeric_cols)
+    final_data = remove_outliers(data_cleaned, lower_bound, upper_bound)
+    memory_budget.checkpoint("Outlier filtering", data, data_cleaned, final_data)
+
+    # Step 8: correlation of the visual data with the target
+    visual_data = drop_unused_columns(build_visual_data(data))
+    correlations = classify_correlations(numeric_columns(visual_data).corr(), target)
+    memory_budget.checkpoint("Correlation", data, final_data, visual_data)
+
+    # Step 9: ANOVA on the raw categorical columns
+    categorical_columns = [col for col in categorical_columns if col in final_data.columns]
+    anova_df = anova(final_data, categorical_columns, target) if categorical_columns else pd.DataFrame()
+
+    # Step 10 and 11: encode, split and scale
+    categorical_dictionary = CategoricalDictionary.from_frame(data)
+    final_data = encode_categoricals(final_data, dictionary=categorical_dictionary)
+    if selected_features is None:
+        selected_features = default_features(final_data, target)
+    X, y, X_train, X_test, y_train, y_test = split_data(final_data, selected_features, target, test_size)
+    scaler, X_train_scaled, X_test_scaled = scale_data(X_train, X_test)
+    memory_budget.checkpoint("Split and scale", data, final_data, X_train, X_test)
+
+    # Steps 12 to 14: train, select and retrain the best model
+    candidate_models, search_summary = build_candidate_models(len(X_train), scale_thresholds), None
+    if tune_budget:
+        candidate_models, search_summary = tune_models(X_train_scaled, y_train, candidate_models, dataset_key, target,
+                                                       selected_features, tune_budget, n_jobs, test_size=test_size,
+                                                       lean=downcast, streaming=False)
+    trained_models, model_performance = train_models(X_train_scaled, y_train, X_test_scaled, y_test,
+                                                     candidate_models, n_jobs=n_jobs)
+    memory_budget.checkpoint("Model training", data, final_data, X_train, X_test)
+    cv_performance = None
+    if cv_folds:
+        cv_performance = cross_validate_models(X, y, make_folds(len(X), cv_folds), candidate_models, n_jobs)
+        best_model_name = select_best_model(cv_performance, "CV MSE Mean")
+    else:
+        best_model_name = select_best_model(model_performance)
+    version = bundle_version(dataset_key, target, selected_features, test_size, best_model_name,
+                             trained_models[best_model_name], lean=downcast, streaming=False)
+    bundle_written = False
+    if model_filename is not None and saved_version(model_filename) == version:
+        # The saved bundle was trained on the same data and configuration
+        bundle = load_bundle(model_filename)
+    else:
+        best_model, full_scaler = retrain_best_model(trained_models[best_model_name], scaler, X, y)
+        bundle = build_bundle(best_model, full_scaler, selected_features, target, version, best_model_name,
+                              categorical_dictionary,
+                              {**model_performance[best_model_name], **(cv_performance or {}).get(best_model_name, {})})
+        if model_filename is not None:
+            bundle_written = save_bundle(bundle, model_filename)
+
+    return {
+        "dataset_key": dataset_key,
+        "rows": len(data),
+        "final_rows": len(final_data),
+        "target": target,
+        "selected_features": list(selected_features),
+        "correlations": correlations,
+        "anova": anova_df,
+        "model_performance": pd.DataFrame(model_performance).T,
+        "cv_performance": None if cv_performance is None else pd.DataFrame(cv_performance).T,
+        "search": search_summary,
+        "model_variants": scale_variants(len(X_train), scale_thresholds),
+        "best_model_name": best_model_name,
+        "best_model": bundle.model,
+        "scaler": bundle.scaler,
+        "bundle": bundle,
+        "bundle_written": bundle_written,
+        "categorical_dictionary": categorical_dictionary,
+        "model_filename": model_filename,
+        "memory": memory_budget.report(),
+    }
@@ -0,0 +1,109 @@
+# Command-line entry point that runs the furniture price pipeline over many CSV files.
+#
+# Example (nightly retraining):
+#     python pipeline_cli.py exports/*.csv --target price --output-dir models --report report.jsonl
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+
+from memory_budget import MemoryBudget, enable_copy_on_write
+from model_training import SCALE_THRESHOLDS
+from pipeline import run_pipeline
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Train and select furniture price models for one or more CSV files.")
+    parser.add_argument("csv_files", nargs="+", help="CSV files to process")
+    parser.add_argument("--target", default="price", help="target (dependent) variable, default: price")
+    parser.add_argument("--features", nargs="+", default=None,
+                        help="predictor variables, default: every numeric column except the target")
+    parser.add_argument("--test-size", type=float, default=0.2, help="fraction of rows held out for testing")
+    parser.add_argument("--output-dir", default=".", help="directory the best model of each file is saved to")
+    parser.add_argument("--report", default=None, help="append one JSON line per file to this report")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="worker processes used for model training")
+    parser.add_argument("--lean", action="store_true",
+                        help="memory-lean mode: downcast numeric columns and share buffers between stages")
+    parser.add_argument("--memory-budget-mb", type=float, default=None,
+                        help="fail a file when a stage's memory use goes over this many MB")
+    parser.add_argument("--tune-budget", type=float, default=None,
+                        help="seconds of hyperparameter search before training, resumed on later runs")
+    parser.add_argument("--cv-folds", type=int, default=None,
+                        help="choose the best model by k-fold cross-validation with this many folds")
+    parser.add_argument("--combine", action="store_true",
+                        help="train one model on all files together (read concurrently, columns aligned)")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="with --combine, keep rows that appear in more than one file")
+    for family, flag in [("Random Forest Regressor", "--forest-threshold"), ("SVM Regressor", "--svm-threshold")]:
+        parser.add_argument(flag, type=int, default=SCALE_THRESHOLDS[family],
+                            help=f"training rows above which {family} is replaced by its scalable variant "
+                                 f"(default: {SCALE_THRESHOLDS[family]:,})")
+    return parser
+
+
+def summarize(csv_file, result, elapsed):
+    return {
+        "file": csv_file,
+        "dataset_key": result["dataset_key"],
+        "rows": result["rows"],
+        "final_rows": result["final_rows"],
+        "target": result["target"],
+        "selected_features": result["selected_features"],
+        "best_model": result["best_model_name"],
+        "model_file": result["model_filename"],
+        "model_version": result["bundle"].version,
+        "model_written": result["bundle_written"],
+        "model_performance": result["model_performance"].to_dict(orient="index"),
+        "cv_performance": None if result["cv_performance"] is None else result["cv_performance"].to_dict(orient="index"),
+        "memory": result["memory"].to_dict(orient="records"),
+        "search": result["search"],
+        "model_variants": result["model_variants"],
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.lean:
+        enable_copy_on_write()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.combine:
+        jobs = [(args.csv_files, "combined")]
+    else:
+        jobs = [(csv_file, os.path.splitext(os.path.basename(csv_file))[0]) for csv_file in args.csv_files]
+
+    failures = 0
+    for csv_file, stem in jobs:
+        model_filename = os.path.join(args.output_dir, f"{stem}_best_model.joblib")
+        start = time.perf_counter()
+        try:
+            result = run_pipeline(csv_file, target=args.target, selected_features=args.features,
+                                  test_size=args.test_size, model_filename=model_filename, n_jobs=args.n_jobs,
+                                  downcast=args.lean, memory_budget=MemoryBudget(args.memory_budget_mb),
+                                  tune_budget=args.tune_budget, cv_folds=args.cv_folds,
+                                  dedupe=not args.keep_duplicates,
+                                  scale_thresholds={"Random Forest Regressor": args.forest_threshold,
+                                                    "SVM Regressor": args.svm_threshold})
+        except Exception:
+            # Keep going so one bad export does not stop the whole batch
+            failures += 1
+            summary = {"file": csv_file, "error": traceback.format_exc(limit=3)}
+            print(f"{csv_file}: FAILED", file=sys.stderr)
+            print(summary["error"], file=sys.stderr)
+        else:
+            summary = summarize(csv_file, result, time.perf_counter() - start)
+            action = "saved to" if summary["model_written"] else "unchanged in"
+            print(f"{csv_file}: best model {summary['best_model']} {action} {model_filename} ({summary['seconds']}s)")
+
+        if args.report:
+            with open(args.report, "a") as report:
+                report.write(json.dumps(summary, default=str) + "\n")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# Chart drawing functions used by the Streamlit app.
+#
+# Each function returns a matplotlib figure so it can be rendered once and cached. Above a
+# row threshold the Step 3 pairplot is drawn either from a stratified sample or from
+# precomputed 2D histograms (density bins), instead of one marker per row.
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+# Above this many rows the full point-by-point pairplot is replaced
+PAIRPLOT_ROW_THRESHOLD = 5000
+PAIRPLOT_SAMPLE_SIZE = 5000
+PAIRPLOT_BINS = 40
+
+
+def stratified_sample(frame, n_rows, stratify_by=None, seed=42):
+    """Sample about n_rows rows, keeping the share of each stratify_by group."""
+    if len(frame) <= n_rows:
+        return frame
+    if stratify_by is None or stratify_by not in frame.columns:
+        return frame.sample(n_rows, random_state=seed)
+    fraction = n_rows / len(frame)
+    return frame.groupby(stratify_by, group_keys=False).sample(frac=fraction, random_state=seed)
+
+
+def binned_pair_grids(frame, columns, bins=PAIRPLOT_BINS):
+    """Compute the 1D histograms and pairwise 2D histograms drawn by the binned pairplot."""
+    values = {col: frame[col].to_numpy(dtype=float) for col in columns}
+    edges = {}
+    for col in columns:
+        finite = values[col][np.isfinite(values[col])]
+        low, high = (finite.min(), finite.max()) if len(finite) else (0.0, 1.0)
+        edges[col] = np.linspace(low, high if high > low else low + 1, bins + 1)
+
+    grids = {"columns": list(columns), "edges": edges, "histograms": {}, "pairs": {}}
+    for col in columns:
+        grids["histograms"][col], _ = np.histogram(values[col][np.isfinite(values[col])], bins=edges[col])
+    for i, row_col in enumerate(columns):
+        for col_col in columns[:i]:
+            mask = np.isfinite(values[row_col]) & np.isfinite(values[col_col])
+            counts, _, _ = np.histogram2d(values[col_col][mask], values[row_col][mask], bins=[edges[col_col], edges[row_col]])
+            grids["pairs"][(row_col, col_col)] = counts
+    return grids
+
+
+def draw_binned_pairplot(grids):
+    """Draw a pairplot-shaped grid of density heatmaps from binned_pair_grids output."""
+    columns = grids["columns"]
+    edges = grids["edges"]
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    for i, row_col in enumerate(columns):
+        for j, col_col in enumerate(columns):
+            ax = axes[i][j]
+            if i == j:
+                ax.stairs(grids["histograms"][row_col], edges[row_col], fill=True, alpha=0.7)
+            else:
+                # Pairs are stored once; the upper triangle is the transpose of the lower one
+                counts = grids["pairs"][(row_col, col_col)] if i > j else grids["pairs"][(col_col, row_col)].T
+                ax.pcolormesh(edges[col_col], edges[row_col], np.log1p(counts).T, cmap="viridis")
+            if i == k - 1:
+                ax.set_xlabel(col_col)
+            if j == 0:
+                ax.set_ylabel(row_col)
+    fig.tight_layout()
+    return fig
+
+
+def draw_pairplot(frame):
+    return sns.pairplot(frame).figure
+
+
+def draw_histogram(values, column, figsize=None):
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.hist(values, bins=30, edgecolor='k', alpha=0.7)
+    ax.set_title(f"Distribution of {column}")
+    ax.set_xlabel(column)
+    ax.set_ylabel('Frequency')
+    return fig
+
+
+def draw_countplot(data, column):
+    # Create a count plot (bar plot) for a categorical variable
+    fig, ax = plt.subplots()
+    sns.countplot(x=column, data=data, ax=ax)
+    ax.set_title(f"Count of {column}")
+    ax.set_xlabel(column)
+    ax.set_ylabel('Frequency')
+    return fig
+
+
+def draw_heatmap(correlation_matrix):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', ax=ax)
+    return fig
+
+
+def draw_boxplot(data, cat_col, target):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.boxplot(x=cat_col, y=target, data=data, ax=ax)
+    ax.set_title(f"{cat_col} vs {target}")
+    return fig
+
+
+def draw_model_comparison(performance_df):
+    """Bar plots comparing MSE, R2 and MAE across the models (one row per model)."""
+    model_names = list(performance_df.index)
+    fig, ax = plt.subplots(3, 1, figsize=(10, 12))
+
+    # MSE Comparison
+    ax[0].bar(model_names, performance_df["MSE"], color='blue')
+    ax[0].set_title("Model Comparison: Mean Squared Error (MSE)")
+    ax[0].set_ylabel("MSE")
+
+    # R2 Score Comparison
+    ax[1].bar(model_names, performance_df["R2 Score"], color='green')
+    ax[1].set_title("Model Comparison: R2 Score")
+    ax[1].set_ylabel("R2 Score")
+
+    # MAE Comparison
+    ax[2].bar(model_names, performance_df["MAE"], color='red')
+    ax[2].set_title("Model Comparison: Mean Absolute Error (MAE)")
+    ax[2].set_ylabel("MAE")
+
+    fig.tight_layout()
+    return fig
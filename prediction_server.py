@@ -0,0 +1,199 @@
+# Long-lived local prediction service for the saved model bundle.
+#
+# The bundle is loaded once, memory-mapped, and kept in memory. Concurrent single-row requests
+# are collected into micro-batches, so they are scored with one vectorized predict call.
+#
+# Example:
+#     python prediction_server.py --model best_model.joblib --port 8765
+#     curl -X POST localhost:8765/predict -d '{"features": {"type": "Sofa", "rate": 4, ...}}'
+#     curl localhost:8765/metrics
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from model_bundle import BUNDLE_FILENAME, load_bundle
+from pipeline import parse_sale
+
+
+class MicroBatcher:
+    """Scores rows in batches of up to max_batch_size, waiting at most max_wait_ms to fill one.
+
+    Rows are cleaned and encoded like batch_scoring's: categorical features are sent as labels (unseen
+    labels are coded like missing ones) and 'sale' may be a percentage string such as "20%".
+    """
+
+    def __init__(self, bundle, max_batch_size=256, max_wait_ms=5.0, latency_window=10_000):
+        self.bundle = bundle
+        self.feature_names = bundle.feature_names
+        self._dictionary = bundle.dictionary
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._requests = queue.Queue()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self.requests_served = 0
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def predict(self, rows, timeout=30.0):
+        """Queue rows (dicts of feature values) and block until their predictions are ready."""
+        pending = []
+        # Encoded here, so a malformed row fails its own request instead of the batch it would join
+        for values in self.encode(rows).itertuples(index=False):
+            done = threading.Event()
+            request = {"values": list(values), "done": done, "start": time.perf_counter(), "result": None,
+                       "error": None}
+            self._requests.put(request)
+            pending.append(request)
+
+        for request in pending:
+            if not request["done"].wait(timeout):
+                raise TimeoutError("Prediction timed out")
+            if request["error"] is not None:
+                raise request["error"]
+        return [request["result"] for request in pending]
+
+    def encode(self, rows):
+        """Return the bundle's feature matrix for rows, as batch_scoring.prepare_features does for a chunk."""
+        for row in rows:
+            missing = [name for name in self.feature_names if name not in row]
+            if missing:
+                raise ValueError(f"Missing feature(s): {', '.join(missing)}")
+        frame = pd.DataFrame([[row[name] for name in self.feature_names] for row in rows], columns=self.feature_names)
+        if 'sale' in frame.columns and frame['sale'].dtype == object:
+            # JSON rows may mix numbers and percentage strings, which a CSV column never does
+            frame['sale'] = frame['sale'].astype('string')
+        return self.bundle.encode(parse_sale(frame), self._dictionary).astype(float)
+
+    def _run(self):
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            features = pd.DataFrame([request["values"] for request in batch], columns=self.feature_names)
+            predictions = self.bundle.predict(features)
+        except Exception as error:
+            for request in batch:
+                request["error"] = error
+                request["done"].set()
+            return
+
+        finished = time.perf_counter()
+        with self._lock:
+            for request, prediction in zip(batch, predictions):
+                self._latencies.append(finished - request["start"])
+            self._batch_sizes.append(len(batch))
+            self.requests_served += len(batch)
+        for request, prediction in zip(batch, predictions):
+            request["result"] = float(prediction)
+            request["done"].set()
+
+    def metrics(self):
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000.0
+            batch_sizes = np.array(self._batch_sizes)
+            served = self.requests_served
+        if len(latencies) == 0:
+            return {"requests_served": served}
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        return {
+            "requests_served": served,
+            "latency_ms": {"p50": p50, "p90": p90, "p99": p99, "max": latencies.max()},
+            "mean_batch_size": batch_sizes.mean(),
+        }
+
+
+def make_handler(batcher):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send_json(200, batcher.metrics())
+            elif self.path == "/health":
+                self._send_json(200, {"status": "ok", "version": batcher.bundle.version,
+                                      "model": batcher.bundle.model_name, "features": batcher.feature_names})
+            else:
+                self._send_json(404, {"error": "unknown path"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "unknown path"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                # Either one row under "features" or several under "rows"
+                rows = payload["rows"] if "rows" in payload else [payload["features"]]
+                predictions = batcher.predict(rows)
+            except (ValueError, KeyError, TypeError) as error:
+                self._send_json(400, {"error": str(error)})
+                return
+            except TimeoutError as error:
+                self._send_json(503, {"error": str(error)})
+                return
+            self._send_json(200, {"predictions": predictions})
+
+        def log_message(self, format, *args):
+            pass  # keep the console quiet under load
+
+    return PredictionHandler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops connections under concurrent load
+
+
+def load_batcher(model_filename, **batch_options):
+    return MicroBatcher(load_bundle(model_filename), **batch_options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve price predictions from the saved best model.")
+    parser.add_argument("--model", default=BUNDLE_FILENAME, help="model bundle saved by the app or pipeline_cli.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="how long the first request of a batch waits for others to join")
+    args = parser.parse_args(argv)
+
+    batcher = load_batcher(args.model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    server = PredictionServer((args.host, args.port), make_handler(batcher))
+    print(f"Serving {args.model} (version {batcher.bundle.version}) on http://{args.host}:{args.port} "
+          f"(features: {', '.join(batcher.feature_names)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
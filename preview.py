@@ -0,0 +1,68 @@
+# Paginated previews of large frames, with the serialized pages kept in a least-recently-used cache.
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+
+PAGE_SIZE = 100
+
+
+def page_count(n_rows, page_size=PAGE_SIZE):
+    return max(1, -(-n_rows // page_size))
+
+
+def page_bounds(n_rows, page, page_size=PAGE_SIZE):
+    """First and last (exclusive) row of a 1-based page, clamped to the frame."""
+    page = min(max(page, 1), page_count(n_rows, page_size))
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n_rows)
+
+
+def serialize_page(frame, start, stop):
+    table = pa.Table.from_pandas(frame.iloc[start:stop], preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_page(payload):
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+class PageCache:
+    """Least-recently-used store of serialized pages, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._pages = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pages)
+
+    def page(self, frame_key, frame, page, page_size=PAGE_SIZE):
+        """Return one page of frame as a DataFrame, serializing it only on a miss."""
+        start, stop = page_bounds(len(frame), page, page_size)
+        key = (frame_key, start, stop)
+        with self._lock:
+            payload = self._pages.get(key)
+            if payload is not None:
+                self._pages.move_to_end(key)
+        if payload is not None:
+            return deserialize_page(payload)
+
+        payload = serialize_page(frame, start, stop)
+        with self._lock:
+            if key in self._pages:
+                # Another session serialized the same page meanwhile
+                self._size -= len(self._pages[key])
+            self._pages[key] = payload
+            self._size += len(payload)
+            while len(self._pages) > self.max_entries or (self._size > self.max_bytes and len(self._pages) > 1):
+                _, evicted = self._pages.popitem(last=False)
+                self._size -= len(evicted)
+        return deserialize_page(payload)
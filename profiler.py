@@ -0,0 +1,75 @@
+# Single-pass dataset profile.
+#
+# Every column is visited once to collect what the exploration steps show: its data type
+# (as loaded and after 'sale' parsing), missing and distinct counts, the describe() summary,
+# IQR outlier bounds and outlier counts. The app caches one profile per dataset and Steps 1,
+# 4, 6 and 7 read their tables from it instead of recomputing them on every rerun.
+import numpy as np
+import pandas as pd
+
+from pipeline import parse_sale
+
+SUMMARY_ROWS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def _numeric_summary(values, factor):
+    # describe() statistics, IQR bounds and outlier count of one numeric column
+    valid = values[~np.isnan(values)]
+    if len(valid) == 0:
+        return [0.0] + [np.nan] * 7, np.nan, np.nan, 0
+    minimum, q1, median, q3, maximum = np.percentile(valid, [0, 25, 50, 75, 100])
+    std = valid.std(ddof=1) if len(valid) > 1 else np.nan
+    lower, upper = q1 - factor * (q3 - q1), q3 + factor * (q3 - q1)
+    outliers = int(((valid < lower) | (valid > upper)).sum())
+    return [float(len(valid)), valid.mean(), std, minimum, q1, median, q3, maximum], lower, upper, outliers
+
+
+class DatasetProfile:
+    """Per-column types, counts, summary statistics and IQR outlier bounds of a frame."""
+
+    def __init__(self, frame, prepare=parse_sale, factor=1.5):
+        self.shape = frame.shape
+        self.factor = factor
+        # Numeric statistics are taken after prepare (e.g. 'sale' parsed to a number)
+        prepared = prepare(frame.copy(deep=False)) if prepare is not None else frame
+
+        columns = {}
+        summary = {}
+        lower, upper, outliers = {}, {}, {}
+        for col in frame.columns:
+            column = prepared[col]
+            columns[col] = {
+                "Data Type": str(frame[col].dtype),
+                "Analysis Type": str(column.dtype),
+                "Missing Values": int(column.isna().sum()),
+                "Distinct Values": int(column.nunique()),
+            }
+            if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+                values = column.to_numpy(dtype=float, na_value=np.nan)
+                summary[col], lower[col], upper[col], outliers[col] = _numeric_summary(values, factor)
+
+        self.columns = pd.DataFrame.from_dict(columns, orient="index")
+        self.summary = pd.DataFrame(summary, index=SUMMARY_ROWS)
+        self.lower_bound = pd.Series(lower, dtype=float)
+        self.upper_bound = pd.Series(upper, dtype=float)
+        self.outliers = pd.Series(outliers, dtype=int)
+
+    def dtype_table(self, columns=None, analysis=False):
+        """Column names and data types, as loaded or (analysis=True) after prepare."""
+        types = self.columns["Analysis Type" if analysis else "Data Type"]
+        if columns is not None:
+            types = types[list(columns)]
+        return types.rename("Data Type").rename_axis("Column Name").reset_index()
+
+    def describe(self, columns=None):
+        return self.summary if columns is None else self.summary[[col for col in columns if col in self.summary]]
+
+    def missing_values(self, columns=None):
+        missing = self.columns["Missing Values"]
+        return missing if columns is None else missing[list(columns)]
+
+    def iqr_bounds(self, columns):
+        return self.lower_bound[list(columns)], self.upper_bound[list(columns)]
+
+    def outlier_counts(self, columns):
+        return self.outliers[list(columns)]
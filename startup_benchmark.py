@@ -0,0 +1,92 @@
+# Cold-start benchmark for the Streamlit app.
+#
+# Every measurement runs in a fresh interpreter: the app's landing page (no upload yet) is
+# run through Streamlit's AppTest, and each project module is imported on its own. The
+# landing page must not load any of HEAVY_MODULES, and the median times are written to a
+# JSON file so an import-time regression shows up against an earlier run.
+#
+# Example:
+#     python startup_benchmark.py --output startup.json
+#     python startup_benchmark.py --output new.json --compare startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmark_report import compare, environment
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, "StreamlitSampleProject.py")
+HEAVY_MODULES = ("sklearn", "scipy", "seaborn", "matplotlib", "joblib")
+PROJECT_MODULES = ("pipeline", "profiler", "batch_scoring", "model_bundle", "prediction_server", "plotting",
+                   "model_training", "hyperparameter_search")
+
+LANDING_PAGE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=60)
+start = time.perf_counter()
+app.run()
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(m for m in {heavy!r} if m in sys.modules),
+                   "errors": [e.message for e in app.exception]}}))
+"""
+
+MODULE_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(m for m in {heavy!r} if m in sys.modules), "errors": []}}))
+"""
+
+
+def run_fresh(code):
+    """Run code in a new interpreter and return the JSON it prints last."""
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(stage, code, repeats):
+    runs = [run_fresh(code) for _ in range(repeats)]
+    record = {"stage": stage, "seconds": round(statistics.median(run["seconds"] for run in runs), 6),
+              "modules": runs[-1]["modules"], "errors": runs[-1]["errors"]}
+    loaded = ", ".join(record["modules"]) or "-"
+    print(f"{stage:<32} {record['seconds']:8.3f}s  heavy modules: {loaded}")
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the app's cold start and each module's import time.")
+    parser.add_argument("--repeats", type=int, default=3, help="fresh interpreters per measurement (median is kept)")
+    parser.add_argument("--output", default="startup_results.json", help="JSON file the results are written to")
+    parser.add_argument("--compare", default=None, help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown factor reported as a regression, default 1.25")
+    args = parser.parse_args(argv)
+
+    results = [measure("landing page", LANDING_PAGE.format(app=APP, heavy=HEAVY_MODULES), args.repeats)]
+    for module in PROJECT_MODULES:
+        results.append(measure(f"import {module}", MODULE_IMPORT.format(module=module, heavy=HEAVY_MODULES),
+                               args.repeats))
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    failures = 0
+    landing = results[0]
+    if landing["modules"] or landing["errors"]:
+        failures += 1
+        print(f"REGRESSION landing page loaded {landing['modules']} (errors: {landing['errors']})")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures += compare(results, baseline, args.threshold)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# Dependency-tracked memoization of the app's steps.
+#
+# Each stage declares its inputs (dataset key, target, selected features, test size, ...)
+# and the stages it is computed from. A stage's key is a digest of both, so a changed input
+# invalidates that stage and, through the keys, every stage downstream of it, while all
+# other stages return their memoized result on the next rerun.
+import hashlib
+import time
+
+import pandas as pd
+
+
+def stage_key(inputs, upstream_keys):
+    return hashlib.sha256(repr((tuple(inputs), tuple(upstream_keys))).encode()).hexdigest()[:16]
+
+
+class StepGraph:
+    """Memoized stage results of one session, recomputed only when a stage's key changes."""
+
+    def __init__(self):
+        self._stages = {}
+        self.runs = []
+
+    def start_run(self):
+        """Forget the previous rerun's stage report (memoized results are kept)."""
+        self.runs = []
+
+    def key(self, name):
+        return self._stages[name]["key"]
+
+    def run(self, name, compute, inputs=(), depends=()):
+        """Return compute()'s result for these inputs and upstream stages, computing it only if they changed.
+
+        The stages in depends must already have run during this rerun.
+        """
+        key = stage_key(inputs, [self.key(upstream) for upstream in depends])
+        entry = self._stages.get(name)
+        if entry is not None and entry["key"] == key:
+            self.runs.append({"Stage": name, "Status": "reused", "Seconds": 0.0})
+            return entry["value"]
+
+        start = time.perf_counter()
+        value = compute()
+        seconds = time.perf_counter() - start
+        self._stages[name] = {"key": key, "value": value}
+        self.runs.append({"Stage": name, "Status": "computed", "Seconds": seconds})
+        return value
+
+    def report(self):
+        return pd.DataFrame(self.runs, columns=["Stage", "Status", "Seconds"])
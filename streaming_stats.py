@@ -0,0 +1,234 @@
+# Chunked CSV ingestion with one-pass, mergeable statistics.
+#
+# A file is read in chunks and each chunk only updates small running summaries (count,
+# mean, variance, min/max, missing counts and a quantile sketch), so files that do not
+# fit in memory can still be profiled and outlier-filtered.
+#
+# Example (two passes over the file, one chunk in memory at a time):
+#     python streaming_stats.py history.csv --filtered history_filtered.csv
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from type_inference import infer_schema, apply_schema
+
+CHUNK_SIZE = 100_000
+
+
+class QuantileSketch:
+    """Mergeable approximate quantile sketch (a simplified KLL compactor).
+
+    Level h holds values that each stand for 2**h original values. When a level grows
+    past k values it is sorted and every other value is promoted to the next level.
+    """
+
+    def __init__(self, k=2000, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                level = np.sort(self.levels[h])
+                leftover = level[:0]
+                if len(level) % 2:
+                    leftover, level = level[-1:], level[:-1]
+                promoted = level[self._rng.integers(2)::2]
+                self.levels[h] = leftover
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return values[order][min(index, len(values) - 1)]
+
+
+class ColumnStats:
+    """Running count, mean, variance (Chan et al.), min, max and quantiles of one numeric column."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        other = ColumnStats()
+        other.count = len(values)
+        other.mean = values.mean()
+        other.m2 = ((values - other.mean) ** 2).sum()
+        other.min = values.min()
+        other.max = values.max()
+        self._combine(other)
+        self.sketch.update(values)
+
+    def merge(self, other):
+        self._combine(other)
+        self.sketch.merge(other.sketch)
+
+    def _combine(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class StreamingProfile:
+    """Summary statistics of a dataset built up one chunk at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.missing = {}
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+        for col in chunk.select_dtypes(include=['number']).columns:
+            self.columns.setdefault(col, ColumnStats()).update(chunk[col].to_numpy(dtype=float, na_value=np.nan))
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col, count in other.missing.items():
+            self.missing[col] = self.missing.get(col, 0) + count
+        for col, stats in other.columns.items():
+            self.columns.setdefault(col, ColumnStats()).merge(stats)
+
+    def quantiles(self, q):
+        return pd.Series({col: stats.sketch.quantile(q) for col, stats in self.columns.items()}, dtype=float)
+
+    def missing_values(self):
+        return pd.Series(self.missing, dtype='int64')
+
+    def describe(self):
+        """Return a table shaped like DataFrame.describe() for the numeric columns."""
+        summary = {}
+        for col, stats in self.columns.items():
+            summary[col] = {
+                "count": stats.count,
+                "mean": stats.mean if stats.count else np.nan,
+                "std": stats.std,
+                "min": stats.min if stats.count else np.nan,
+                "25%": stats.sketch.quantile(0.25),
+                "50%": stats.sketch.quantile(0.5),
+                "75%": stats.sketch.quantile(0.75),
+                "max": stats.max if stats.count else np.nan,
+            }
+        return pd.DataFrame(summary)
+
+    def iqr_bounds(self, columns=None, factor=1.5):
+        """Return the (lower, upper) outlier bounds used in Step 6."""
+        Q1 = self.quantiles(0.25)
+        Q3 = self.quantiles(0.75)
+        if columns is not None:
+            Q1, Q3 = Q1[list(columns)], Q3[list(columns)]
+        IQR = Q3 - Q1
+        return Q1 - factor * IQR, Q3 + factor * IQR
+
+
+def read_csv_chunks(source, chunksize=CHUNK_SIZE, schema=None, prepare=None):
+    """Yield cleaned chunks of a CSV, typing every chunk with the schema of the first one."""
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        if schema is None:
+            schema = infer_schema(chunk)
+        chunk = apply_schema(chunk, schema)
+        if prepare is not None:
+            chunk = prepare(chunk)
+        yield chunk
+
+
+def profile_csv(source, chunksize=CHUNK_SIZE, schema=None, prepare=None):
+    """Profile a CSV in a single chunked pass without holding it in memory."""
+    profile = StreamingProfile()
+    for chunk in read_csv_chunks(source, chunksize, schema, prepare):
+        profile.update(chunk)
+    return profile
+
+
+def filter_outliers_csv(source, destination, lower_bound, upper_bound, chunksize=CHUNK_SIZE, schema=None, prepare=None):
+    """Stream rows whose numeric values lie within the bounds into destination and return how many were kept."""
+    columns = list(lower_bound.index)
+    kept = 0
+    header = True
+    for chunk in read_csv_chunks(source, chunksize, schema, prepare):
+        outside = (chunk[columns] < lower_bound) | (chunk[columns] > upper_bound)
+        chunk = chunk[~outside.any(axis=1)]
+        chunk.to_csv(destination, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        kept += len(chunk)
+    return kept
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile a CSV in chunks and optionally write its outlier-free rows.")
+    parser.add_argument("source", help="CSV file to profile")
+    parser.add_argument("--filtered", default=None, help="write the rows inside the IQR bounds to this CSV")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows read at a time")
+    parser.add_argument("--factor", type=float, default=1.5, help="IQR multiplier of the outlier bounds")
+    args = parser.parse_args(argv)
+
+    # Imported here, pipeline imports this module through anova_engine
+    from pipeline import drop_unused_columns, parse_sale
+
+    def prepare(chunk):
+        return parse_sale(drop_unused_columns(chunk))
+
+    profile = profile_csv(args.source, args.chunksize, prepare=prepare)
+    print(f"{profile.rows:,} rows")
+    print(profile.describe().to_string())
+    print("Missing values:")
+    print(profile.missing_values().to_string())
+
+    if args.filtered:
+        # 'rate' is left out of the outlier test, as in Step 6
+        lower_bound, upper_bound = profile.iqr_bounds([col for col in profile.columns if col != "rate"], args.factor)
+        kept = filter_outliers_csv(args.source, args.filtered, lower_bound, upper_bound, args.chunksize,
+                                   prepare=prepare)
+        print(f"Kept {kept:,} of {profile.rows:,} rows in {args.filtered}")
+
+
+if __name__ == "__main__":
+    main()
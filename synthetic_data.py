@@ -0,0 +1,75 @@
+# Synthetic datasets shaped like the furniture price CSVs, for benchmarking.
+#
+# Example:
+#     python synthetic_data.py 1000000 furniture_1m.csv
+import argparse
+
+import numpy as np
+import pandas as pd
+
+FURNITURE_TYPES = ["Modern Home", "Classic Living", "Rustic Charm", "Urban Loft", "Outdoor Living",
+                   "Kids Corner", "Office Works", "Coastal Retreat"]
+FURNITURE_ITEMS = ["Sofa", "Armchair", "Dining Table", "Coffee Table", "Bed Frame", "Bookcase", "Desk",
+                   "Wardrobe", "Dresser", "Bar Stool", "TV Stand", "Patio Set"]
+DELIVERY_FEES = np.array([52.0, 172.0, 0.0, 35.0, 99.0, 250.0])
+
+
+def generate_furniture_data(n_rows, seed=0, n_products=None, missing_price_rate=0.02):
+    """Return a DataFrame with the furniture schema (furniture, type, url, rate, delivery, sale, price)."""
+    rng = np.random.default_rng(seed)
+    if n_products is None:
+        n_products = max(100, n_rows // 5)
+
+    # Product names repeat, and a skewed type distribution mimics 'Modern Home' dominating the real data
+    product_ids = rng.integers(0, n_products, n_rows)
+    item_names = np.array(FURNITURE_ITEMS)[product_ids % len(FURNITURE_ITEMS)]
+    furniture = pd.Series(item_names, dtype=object) + " " + pd.Series(product_ids // len(FURNITURE_ITEMS)).astype(str)
+    type_weights = np.array([0.35] + [0.65 / (len(FURNITURE_TYPES) - 1)] * (len(FURNITURE_TYPES) - 1))
+    furniture_type = rng.choice(FURNITURE_TYPES, n_rows, p=type_weights)
+    url = "https://www.furniture.example/products/" + pd.Series(rng.integers(0, n_rows * 2, n_rows)).astype(str)
+
+    # Most items are unrated, and delivery fees cluster on a couple of default values
+    rate = np.where(rng.random(n_rows) < 0.8, 0, rng.integers(1, 6, n_rows))
+    delivery = rng.choice(DELIVERY_FEES, n_rows, p=[0.35, 0.3, 0.1, 0.1, 0.1, 0.05])
+    sale = pd.Series(np.where(rng.random(n_rows) < 0.5, rng.integers(1, 5, n_rows) * 20, rng.integers(0, 80, n_rows))).astype(str) + "%"
+
+    # Prices are log-normal and loosely tied to the delivery fee, with some missing values
+    price = np.round(rng.lognormal(5.0 + delivery / 400.0, 0.9, n_rows), 2)
+    price[rng.random(n_rows) < missing_price_rate] = np.nan
+
+    return pd.DataFrame({
+        "furniture": furniture,
+        "type": furniture_type,
+        "url": url,
+        "rate": rate,
+        "delivery": delivery,
+        "sale": sale,
+        "price": price,
+    })
+
+
+def write_furniture_csv(path, n_rows, seed=0, chunk_rows=1_000_000):
+    """Write n_rows synthetic rows to a CSV in chunks (with an index column like the real exports)."""
+    written = 0
+    chunk_index = 0
+    while written < n_rows:
+        rows = min(chunk_rows, n_rows - written)
+        chunk = generate_furniture_data(rows, seed=seed + chunk_index, n_products=max(100, n_rows // 5))
+        chunk.index = pd.RangeIndex(written, written + rows)
+        chunk.to_csv(path, mode='w' if written == 0 else 'a', header=written == 0)
+        written += rows
+        chunk_index += 1
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic furniture price CSV.")
+    parser.add_argument("rows", type=int, help="number of rows, e.g. 10000 to 10000000")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_furniture_csv(args.output, args.rows, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
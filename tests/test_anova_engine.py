@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from anova_engine import AnovaAccumulator, one_way_anova
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3000
+    color = rng.choice(["red", "green", "blue"], n)
+    material = rng.choice(["oak", "pine", "steel", "glass"], n)
+    # A large offset checks that the sums of squares stay accurate far from zero
+    price = 1e6 + rng.normal(0, 50, n) + np.where(color == "red", 20.0, 0.0)
+    price[::97] = np.nan
+    return pd.DataFrame({"color": color, "material": pd.Categorical(material), "price": price})
+
+
+def expected(frame, column):
+    groups = [group.dropna().to_numpy() for _, group in frame.groupby(column, observed=True)["price"]]
+    return stats.f_oneway(*groups)
+
+
+def test_one_way_anova_matches_scipy(frame):
+    results = one_way_anova(frame, ["color", "material"], "price").set_index("Categorical Variable")
+    for column in ["color", "material"]:
+        f_val, p_val = expected(frame, column)
+        assert results.loc[column, "F-value"] == pytest.approx(f_val, rel=1e-9)
+        assert results.loc[column, "p-value"] == pytest.approx(p_val, rel=1e-6, abs=1e-300)
+
+
+def test_accumulator_over_chunks_matches_batch(frame):
+    accumulator = AnovaAccumulator(["color", "material"], "price")
+    for start in range(0, len(frame), 700):
+        accumulator.update(frame.iloc[start:start + 700])
+    pd.testing.assert_frame_equal(accumulator.results(), one_way_anova(frame, ["color", "material"], "price"),
+                                  rtol=1e-9)
+
+
+def test_merge_of_differently_shifted_accumulators(frame):
+    # The halves start from different first-chunk means, so merging has to re-shift one side
+    low = frame.sort_values("price").iloc[:1500]
+    high = frame.sort_values("price").iloc[1500:]
+    left, right = AnovaAccumulator(["color"], "price"), AnovaAccumulator(["color"], "price")
+    left.update(low)
+    right.update(high)
+    assert left.shift != right.shift
+    left.merge(right)
+
+    f_val, p_val = expected(frame, "color")
+    result = left.results().iloc[0]
+    assert result["F-value"] == pytest.approx(f_val, rel=1e-9)
+    assert result["p-value"] == pytest.approx(p_val, rel=1e-6)
+
+
+def test_merge_into_empty_accumulator(frame):
+    empty, filled = AnovaAccumulator(["color"], "price"), AnovaAccumulator(["color"], "price")
+    filled.update(frame)
+    empty.merge(filled)
+    pd.testing.assert_frame_equal(empty.results(), filled.results())
+
+
+def test_streamed_anova_with_missing_categorical_values(tmp_path):
+    # The app's streamed Step 9: raw chunks are outlier-filtered before any categorical encoding
+    from anova_engine import anova_csv
+    from pipeline import drop_unused_columns, parse_sale, remove_outliers
+    from streaming_stats import profile_csv
+    from synthetic_data import generate_furniture_data
+
+    data = generate_furniture_data(3000, seed=4)
+    data.loc[::40, "type"] = np.nan
+    data.loc[::55, "furniture"] = np.nan
+    path = tmp_path / "furniture.csv"
+    data.to_csv(path)
+
+    def clean(chunk):
+        return parse_sale(drop_unused_columns(chunk))
+
+    profile = profile_csv(path, chunksize=500, prepare=clean)
+    lower_bound, upper_bound = profile.iqr_bounds(["delivery", "sale", "price"])
+    results = anova_csv(path, ["type"], "price", chunksize=500,
+                        prepare=lambda chunk: remove_outliers(clean(chunk), lower_bound, upper_bound))
+
+    kept = remove_outliers(clean(pd.read_csv(path)), lower_bound, upper_bound)
+    assert kept["type"].isna().any()
+    pd.testing.assert_frame_equal(results, one_way_anova(kept, ["type"], "price"), rtol=1e-9)
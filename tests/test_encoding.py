@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from encoding import CategoricalDictionary
+
+
+def test_codes_follow_the_sorted_categories():
+    data = pd.DataFrame({"color": ["red", "blue", "green", "blue"]})
+    dictionary = CategoricalDictionary.build(data, ["color"])
+    assert list(dictionary.categories["color"]) == ["blue", "green", "red"]
+    np.testing.assert_array_equal(dictionary.codes(data["color"], "color"), [2, 0, 1, 0])
+
+
+def test_unseen_and_missing_values_get_minus_one():
+    dictionary = CategoricalDictionary({"color": ["blue", "red"]})
+    codes = dictionary.codes(pd.Series(["red", "purple", None, np.nan]), "color")
+    assert codes.dtype == np.int32
+    np.testing.assert_array_equal(codes, [1, -1, -1, -1])
+
+
+def test_categorical_column_reuses_its_codes():
+    data = pd.DataFrame({"color": ["red", "blue", "green"]})
+    dictionary = CategoricalDictionary.build(data, ["color"])
+    converted = dictionary.apply(data.copy())
+    assert isinstance(converted["color"].dtype, pd.CategoricalDtype)
+    np.testing.assert_array_equal(dictionary.codes(converted["color"], "color"),
+                                  dictionary.codes(data["color"], "color"))
+
+
+def test_categorical_column_with_other_categories_is_recoded():
+    dictionary = CategoricalDictionary({"color": ["blue", "green", "red"]})
+    values = pd.Series(pd.Categorical(["red", "blue", "pink"], categories=["blue", "pink", "red"]))
+    np.testing.assert_array_equal(dictionary.codes(values, "color"), [2, 0, -1])
+
+
+def test_numeric_values_are_coded_by_their_string_form():
+    data = pd.DataFrame({"size": [3, 1, 2, 1]})
+    dictionary = CategoricalDictionary.build(data, ["size"])
+    np.testing.assert_array_equal(dictionary.codes(data["size"], "size"), [2, 0, 1, 0])
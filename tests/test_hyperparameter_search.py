@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsRegressor
+
+from hyperparameter_search import SearchCache, tune_models
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((300, 3))
+    return X, X @ [1.0, 2.0, 3.0] + rng.normal(0, 0.1, 300)
+
+
+def test_families_without_a_finished_round_are_left_out_of_the_summary(tmp_path, data):
+    X, y = data
+    models = {"Linear Regression": LinearRegression(), "KNN Regressor": KNeighborsRegressor()}
+    tuned, summary = tune_models(X, y, models, "dataset", "price", ["a", "b", "c"], 0, n_jobs=1,
+                                 cache=SearchCache(str(tmp_path)))
+    assert summary == {}
+    assert tuned["KNN Regressor"].get_params() == KNeighborsRegressor().get_params()
+
+
+def test_finished_rounds_are_resumed_from_the_cache(tmp_path, data):
+    X, y = data
+    cache = SearchCache(str(tmp_path))
+    # The linear grid has four candidates, so one round exhausts it
+    _, summary = tune_models(X, y, {"Linear Regression": LinearRegression()}, "dataset", "price", ["a", "b", "c"],
+                             30, n_jobs=1, cache=cache)
+    assert summary["Linear Regression"]["Rounds"] == 1
+
+    models = {"Linear Regression": LinearRegression(), "KNN Regressor": KNeighborsRegressor()}
+    tuned, summary = tune_models(X, y, models, "dataset", "price", ["a", "b", "c"], 0, n_jobs=1, cache=cache)
+    assert list(summary) == ["Linear Regression"]
+    assert np.isfinite(summary["Linear Regression"]["Best CV MSE"])
+    assert tuned["Linear Regression"].get_params() == LinearRegression(
+        **summary["Linear Regression"]["Best Parameters"]).get_params()
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from incremental_training import train_incremental
+from synthetic_data import generate_furniture_data
+
+
+def test_trains_on_a_csv_with_missing_categorical_values(tmp_path):
+    # Chunks are outlier-filtered while type and furniture are still strings, so their gaps must survive it
+    data = generate_furniture_data(3000, seed=5)
+    data.loc[::25, "type"] = np.nan
+    data.loc[::35, "furniture"] = np.nan
+    path = tmp_path / "furniture.csv"
+    data.to_csv(path)
+
+    result = train_incremental(str(path), selected_features=["type", "rate", "delivery", "sale"], chunksize=700,
+                               epochs=1, model_filename=str(tmp_path / "model.joblib"))
+
+    assert result["train_rows"] + result["test_rows"] > 0
+    for metrics in result["model_performance"].values():
+        assert np.isfinite(metrics["MSE"])
+    bundle = result["bundle"]
+    assert "type" in bundle.categories
+    rows = pd.DataFrame({"type": [data["type"].dropna().iloc[0], np.nan], "rate": [0, 3], "delivery": [250.0, 0.0],
+                         "sale": [10.0, 0.0]})
+    features = bundle.encode(rows)
+    assert features["type"].iloc[1] == -1
+    assert np.isfinite(bundle.predict(features)).all()
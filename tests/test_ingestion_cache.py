@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingestion_cache import IngestionCache, content_hash
+
+
+def frame(seed, rows=200):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"price": rng.normal(100, 10, rows), "type": rng.choice(["Sofa", "Bed"], rows)})
+
+
+def test_content_hash_depends_only_on_the_bytes():
+    assert content_hash(b"a,b\n1,2\n") == content_hash(b"a,b\n1,2\n")
+    assert content_hash(b"a,b\n1,2\n") != content_hash(b"a,b\n1,3\n")
+
+
+def test_frames_survive_a_restart_through_the_disk_tier(tmp_path):
+    IngestionCache(cache_dir=str(tmp_path)).put("key", frame(0))
+    restarted = IngestionCache(cache_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(restarted.get("key"), frame(0))
+    assert restarted.get("missing") is None
+
+
+def test_memory_tier_keeps_the_most_recently_used_frames(tmp_path):
+    cache = IngestionCache(cache_dir=str(tmp_path), max_memory_items=2)
+    for key in "abc":
+        cache.put(key, frame(ord(key)))
+    assert list(cache._memory) == ["b", "c"]
+    cache.get("b")
+    assert list(cache._memory) == ["c", "b"]
+
+
+def test_disk_tier_evicts_files_over_the_size_cap(tmp_path):
+    cache = IngestionCache(cache_dir=str(tmp_path), max_memory_items=1)
+    cache.put("a", frame(0))
+    # Room for one file only
+    cache.max_disk_bytes = (tmp_path / "a.parquet").stat().st_size * 3 // 2
+    cache.put("b", frame(1))
+    # The least recently used file is evicted; "a" is gone from both tiers
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b.parquet"]
+    assert cache.get("a") is None
+
+
+def test_concurrent_sessions_never_see_a_vanishing_file(tmp_path):
+    # A tiny memory tier and disk cap make every thread read, write and evict the same files
+    cache = IngestionCache(cache_dir=str(tmp_path), max_memory_items=2, max_disk_bytes=20_000)
+    frames = {str(key): frame(key) for key in range(6)}
+    errors = []
+
+    def session(offset):
+        try:
+            for i in range(60):
+                key = str((offset + i) % len(frames))
+                data = cache.get(key)
+                if data is None:
+                    cache.put(key, frames[key])
+                else:
+                    pd.testing.assert_frame_equal(data, frames[key])
+        except Exception as error:  # collected, so the failure is reported from the main thread
+            errors.append(error)
+
+    threads = [threading.Thread(target=session, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not [path for path in tmp_path.iterdir() if path.suffix == ".tmp"]
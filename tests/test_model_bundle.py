@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.preprocessing import StandardScaler
+
+from model_bundle import ModelBundle, bundle_version, load_bundle, save_bundle, saved_version
+
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame({"type": rng.integers(0, 3, 400).astype("int32"), "rate": rng.integers(0, 6, 400),
+                             "delivery": rng.choice([0.0, 50.0, 250.0], 400)})
+    target = 100 + 20 * features["type"] + features["delivery"] / 5 + rng.normal(0, 1, 400)
+    return features, target
+
+
+def make_bundle(model, training_data, version="v1", **options):
+    features, target = training_data
+    scaler = StandardScaler().fit(features)
+    model.fit(scaler.transform(features), np.log1p(target))
+    return ModelBundle(model, scaler, features.columns, "price", version, type(model).__name__,
+                       {"type": ["Bed", "Chair", "Sofa"]}, **options)
+
+
+def test_version_changes_with_the_training_options():
+    model = LinearRegression()
+    args = ("dataset", "price", ["rate"], 0.2, "Linear Regression", model)
+    assert bundle_version(*args, lean=False) == bundle_version(*args, lean=False)
+    assert bundle_version(*args, lean=False) != bundle_version(*args, lean=True)
+
+
+def test_round_trip_predicts_the_same_from_raw_rows(tmp_path, training_data):
+    bundle = make_bundle(LinearRegression(), training_data, target_transform="log1p")
+    filename = str(tmp_path / "model.joblib")
+    assert save_bundle(bundle, filename)
+    assert saved_version(filename) == "v1"
+    assert not save_bundle(bundle, filename)  # same version, not rewritten
+
+    loaded = load_bundle(filename)
+    rows = pd.DataFrame({"type": ["Sofa", "Bed", "Lamp"], "rate": [1, 0, 5], "delivery": [250.0, np.nan, 0.0]})
+    features = loaded.encode(rows)
+    assert features["type"].tolist() == [2, 0, -1]
+    assert features["delivery"].tolist() == [250.0, 0.0, 0.0]
+    np.testing.assert_allclose(loaded.predict(features), bundle.predict(bundle.encode(rows)))
+    # The log1p target transform is undone
+    assert loaded.predict(features)[0] > 100
+
+
+def test_a_new_version_replaces_the_saved_bundle(tmp_path, training_data):
+    filename = str(tmp_path / "model.joblib")
+    save_bundle(make_bundle(LinearRegression(), training_data, "v1"), filename)
+    assert save_bundle(make_bundle(LinearRegression(), training_data, "v2"), filename)
+    assert saved_version(filename) == "v2"
+    assert load_bundle(filename).version == "v2"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["model.joblib", "model.version"]
+
+
+def test_knn_and_scaler_arrays_are_memory_mapped(tmp_path, training_data):
+    filename = str(tmp_path / "model.joblib")
+    save_bundle(make_bundle(KNeighborsRegressor(), training_data), filename)
+    loaded = load_bundle(filename)
+    assert isinstance(loaded.scaler.mean_, np.memmap)
+    assert isinstance(loaded.scaler.scale_, np.memmap)
+    assert isinstance(loaded.model._fit_X, np.memmap)
+    assert all(isinstance(array, np.memmap) for array in loaded.model._tree.get_arrays())
+    assert not isinstance(load_bundle(filename, mmap=False).model._fit_X, np.memmap)
+
+
+def test_tree_arrays_are_copied_on_load(tmp_path, training_data):
+    # sklearn's Tree.__setstate__ copies the nodes into its own buffers, so forests gain nothing from mmap
+    filename = str(tmp_path / "model.joblib")
+    save_bundle(make_bundle(RandomForestRegressor(n_estimators=2, random_state=0), training_data), filename)
+    loaded = load_bundle(filename)
+    assert not isinstance(loaded.model.estimators_[0].tree_.value, np.memmap)
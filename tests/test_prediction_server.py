@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from batch_scoring import prepare_features
+from model_bundle import ModelBundle
+from prediction_server import MicroBatcher
+from type_inference import infer_schema
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    rng = np.random.default_rng(7)
+    features = pd.DataFrame({"type": rng.integers(0, 3, 300).astype("int32"), "delivery": rng.choice([0.0, 250.0], 300),
+                             "sale": rng.integers(0, 80, 300).astype(float)})
+    target = 100 + 30 * features["type"] + features["delivery"] / 5 - features["sale"]
+    scaler = StandardScaler().fit(features)
+    model = LinearRegression().fit(scaler.transform(features), target)
+    return ModelBundle(model, scaler, features.columns, "price", "v1", "Linear Regression",
+                       {"type": ["Bed", "Chair", "Sofa"]})
+
+
+ROWS = [{"type": "Sofa", "delivery": 250, "sale": "20%"}, {"type": "Bed", "delivery": 0, "sale": 5},
+        {"type": "Stool", "delivery": 0, "sale": "0%"}]
+
+
+def test_rows_are_scored_like_batch_scoring(bundle):
+    batcher = MicroBatcher(bundle)
+    raw = pd.DataFrame([{**row, "sale": str(row["sale"]).rstrip("%") + "%"} for row in ROWS])
+    expected = bundle.predict(prepare_features(raw, bundle, infer_schema(raw)))
+    np.testing.assert_allclose(batcher.predict(ROWS), expected)
+
+
+def test_concurrent_requests_share_batches(bundle):
+    batcher = MicroBatcher(bundle, max_batch_size=64, max_wait_ms=50.0)
+    results = {}
+
+    def client(i):
+        results[i] = batcher.predict([ROWS[i % len(ROWS)]])[0]
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(24)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    single = batcher.predict(ROWS)
+    assert [results[i] for i in range(24)] == pytest.approx([single[i % len(ROWS)] for i in range(24)])
+    metrics = batcher.metrics()
+    assert metrics["requests_served"] == 27
+    assert metrics["mean_batch_size"] > 1
+
+
+def test_malformed_rows_fail_only_their_own_request(bundle):
+    batcher = MicroBatcher(bundle)
+    with pytest.raises(ValueError, match="Missing feature"):
+        batcher.predict([{"type": "Sofa"}])
+    with pytest.raises(ValueError):
+        batcher.predict([{**ROWS[0], "sale": "abc"}])
+    assert len(batcher.predict(ROWS)) == 3
+    assert batcher.metrics()["requests_served"] == 3
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import count_outliers, iqr_bounds, parse_sale
+from profiler import DatasetProfile
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(6)
+    n = 500
+    price = rng.lognormal(5, 0.8, n)
+    price[::17] = np.nan
+    return pd.DataFrame({"type": rng.choice(["Sofa", "Bed", None], n), "rate": rng.integers(0, 6, n),
+                         "sale": pd.Series(rng.integers(0, 80, n)).astype(str) + "%", "price": price})
+
+
+def test_summary_matches_describe_after_sale_parsing(frame):
+    profile = DatasetProfile(frame)
+    expected = parse_sale(frame.copy()).describe()
+    pd.testing.assert_frame_equal(profile.describe(expected.columns), expected, check_dtype=False)
+    # The frame itself is not changed by the profile
+    assert frame["sale"].dtype == object
+
+
+def test_types_and_counts_per_column(frame):
+    profile = DatasetProfile(frame)
+    types = profile.dtype_table().set_index("Column Name")["Data Type"]
+    analysis = profile.dtype_table(analysis=True).set_index("Column Name")["Data Type"]
+    assert (types["sale"], analysis["sale"]) == ("object", "float64")
+    pd.testing.assert_series_equal(profile.missing_values(frame.columns), frame.isna().sum(), check_names=False)
+    assert profile.columns.loc["type", "Distinct Values"] == frame["type"].nunique()
+
+
+def test_outlier_bounds_and_counts_match_the_pipeline(frame):
+    profile = DatasetProfile(frame)
+    numeric = parse_sale(frame.copy())[["rate", "sale", "price"]]
+    lower, upper = iqr_bounds(numeric)
+    profile_lower, profile_upper = profile.iqr_bounds(numeric.columns)
+    pd.testing.assert_series_equal(profile_lower, lower, check_names=False)
+    pd.testing.assert_series_equal(profile_upper, upper, check_names=False)
+    pd.testing.assert_series_equal(profile.outlier_counts(numeric.columns), count_outliers(numeric, lower, upper),
+                                   check_names=False)
+
+
+def test_empty_numeric_column():
+    profile = DatasetProfile(pd.DataFrame({"price": [np.nan, np.nan]}), prepare=None)
+    assert profile.describe().loc["count", "price"] == 0
+    assert np.isnan(profile.describe().loc["mean", "price"])
+    assert profile.outlier_counts(["price"])["price"] == 0
@@ -0,0 +1,46 @@
+from step_graph import StepGraph
+
+
+def run_steps(graph, calls, dataset="a", target="price"):
+    # A small chain: load -> profile, load -> train(target); profile does not depend on the target
+    graph.start_run()
+    graph.run("load", lambda: calls.append("load") or dataset.upper(), inputs=[dataset])
+    graph.run("profile", lambda: calls.append("profile") or len(dataset), depends=["load"])
+    return graph.run("train", lambda: calls.append("train") or f"{dataset}:{target}", inputs=[target],
+                     depends=["load"])
+
+
+def test_unchanged_rerun_reuses_every_stage():
+    graph, calls = StepGraph(), []
+    assert run_steps(graph, calls) == "a:price"
+    assert run_steps(graph, calls) == "a:price"
+    assert calls == ["load", "profile", "train"]
+    assert graph.report()["Status"].tolist() == ["reused", "reused", "reused"]
+
+
+def test_changed_input_recomputes_only_its_stage_and_what_depends_on_it():
+    graph, calls = StepGraph(), []
+    run_steps(graph, calls)
+    calls.clear()
+    assert run_steps(graph, calls, target="rate") == "a:rate"
+    assert calls == ["train"]
+    assert graph.report().set_index("Stage")["Status"].to_dict() == {"load": "reused", "profile": "reused",
+                                                                    "train": "computed"}
+
+
+def test_changed_upstream_input_invalidates_the_downstream_stages():
+    graph, calls = StepGraph(), []
+    run_steps(graph, calls)
+    calls.clear()
+    assert run_steps(graph, calls, dataset="b") == "b:price"
+    assert calls == ["load", "profile", "train"]
+
+
+def test_start_run_only_clears_the_report():
+    graph, calls = StepGraph(), []
+    run_steps(graph, calls)
+    graph.start_run()
+    assert graph.report().empty
+    assert list(graph.report().columns) == ["Stage", "Status", "Seconds"]
+    run_steps(graph, calls)
+    assert calls == ["load", "profile", "train"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from streaming_stats import ColumnStats, QuantileSketch, StreamingProfile
+
+
+def test_column_stats_merge_matches_numpy():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(1e6, 5, 4000), rng.normal(0, 1, 3000), [np.nan] * 10])
+    parts = [ColumnStats() for _ in range(3)]
+    for part, chunk in zip(parts, np.array_split(values, 3)):
+        part.update(chunk)
+    merged = ColumnStats()
+    for part in parts:
+        merged.merge(part)
+
+    finite = values[~np.isnan(values)]
+    assert merged.count == len(finite)
+    assert merged.mean == pytest.approx(finite.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(finite.std(ddof=1), rel=1e-9)
+    assert (merged.min, merged.max) == (finite.min(), finite.max())
+
+
+def test_merge_with_empty_column_stats():
+    stats = ColumnStats()
+    stats.update([1.0, 2.0, 3.0])
+    stats.merge(ColumnStats())
+    assert (stats.count, stats.mean, stats.std) == (3, 2.0, 1.0)
+
+
+def test_quantile_sketch_is_exact_below_capacity():
+    sketch = QuantileSketch(k=100)
+    sketch.update(np.arange(1, 51, dtype=float))
+    assert sketch.quantile(0.5) == 25.0
+    assert sketch.quantile(1.0) == 50.0
+
+
+@pytest.mark.parametrize("q", [0.01, 0.25, 0.5, 0.75, 0.99])
+def test_merged_sketches_stay_within_rank_error(q):
+    rng = np.random.default_rng(2)
+    values = rng.lognormal(3, 1, 200_000)
+    sketches = [QuantileSketch(seed=seed) for seed in range(4)]
+    for sketch, chunk in zip(sketches, np.array_split(values, 4)):
+        for piece in np.array_split(chunk, 10):
+            sketch.update(piece)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    assert merged.count == len(values)
+    rank = np.searchsorted(np.sort(values), merged.quantile(q)) / len(values)
+    assert abs(rank - q) < 0.01
+
+
+def test_profile_merge_matches_single_pass():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({"price": rng.normal(100, 10, 5000), "name": rng.choice(["a", "b", None], 5000)})
+    frame.loc[::50, "price"] = np.nan
+    whole = StreamingProfile()
+    whole.update(frame)
+    first, second = StreamingProfile(), StreamingProfile()
+    first.update(frame.iloc[:1234])
+    second.update(frame.iloc[1234:])
+    first.merge(second)
+
+    assert first.rows == whole.rows
+    pd.testing.assert_series_equal(first.missing_values(), whole.missing_values())
+    pd.testing.assert_frame_equal(first.describe().loc[["count", "mean", "std", "min", "max"]],
+                                  whole.describe().loc[["count", "mean", "std", "min", "max"]])
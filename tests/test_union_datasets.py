@@ -0,0 +1,44 @@
+import io
+
+import pandas as pd
+
+from pipeline import combined_key, parse_dataset, read_datasets, union_datasets
+
+
+def csv_bytes(frame):
+    return frame.to_csv().encode()
+
+
+FIRST = pd.DataFrame({"furniture": ["Sofa 1", "Bed 2", "Lamp 3"], "type": ["Modern", "Classic", "Modern"],
+                      "price": [300.0, 500.0, 40.0], "sale": ["10%", "0%", "20%"]})
+# Repeats "Bed 2" under another row number, adds a type and lacks 'sale'
+SECOND = pd.DataFrame({"furniture": ["Bed 2", "Desk 4"], "type": ["Classic", "Office"], "price": [500.0, 150.0]})
+
+
+def test_columns_are_aligned_and_categories_span_every_file():
+    data = union_datasets([parse_dataset(csv_bytes(FIRST)), parse_dataset(csv_bytes(SECOND))], dedupe=False)
+    assert len(data) == 5
+    assert data["sale"].isna().sum() == 2
+    assert isinstance(data["type"].dtype, pd.CategoricalDtype)
+    assert list(data["type"].cat.categories) == ["Classic", "Modern", "Office"]
+    assert data["type"].astype(str).tolist() == ["Modern", "Classic", "Modern", "Classic", "Office"]
+
+
+def test_dedupe_ignores_the_per_file_row_number():
+    data = union_datasets([parse_dataset(csv_bytes(FIRST)), parse_dataset(csv_bytes(FIRST.iloc[[1]]))])
+    assert len(data) == 3
+    assert data["furniture"].astype(str).tolist() == ["Sofa 1", "Bed 2", "Lamp 3"]
+
+
+def test_combined_key_ignores_file_order_but_not_dedupe():
+    assert combined_key(["a", "b"]) == combined_key(["b", "a"])
+    assert combined_key(["a", "b"]) != combined_key(["a", "b"], dedupe=False)
+    assert combined_key(["a", "b"]) != combined_key(["a", "c"])
+
+
+def test_read_datasets_keeps_the_source_order():
+    sources = [io.BytesIO(csv_bytes(FIRST)), io.BytesIO(csv_bytes(SECOND))]
+    (first_key, first), (second_key, second) = read_datasets(sources, max_workers=2)
+    assert first_key != second_key
+    assert (len(first), len(second)) == (3, 2)
+    assert "sale" not in second.columns
@@ -0,0 +1,67 @@
+# Column-level type inference for the furniture datasets.
+#
+# Instead of converting every cell on its own, each object column is typed from a
+# sample of its values and then converted in one vectorized call.
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# Number of non-missing values looked at when deciding a column's type
+SAMPLE_SIZE = 1000
+
+NUMERIC = "numeric"
+DATETIME = "datetime"
+STRING = "string"
+
+
+def _infer_column_type(sample):
+    if sample.empty:
+        return STRING, None
+
+    # A column is numeric only if every sampled value parses as a number
+    if pd.to_numeric(sample, errors='coerce').notna().all():
+        return NUMERIC, None
+
+    # Dates need digits and a format we can reuse for the whole column (this rules out 'url')
+    first = str(sample.iloc[0])
+    if '://' in first or not any(char.isdigit() for char in first):
+        return STRING, None
+    date_format = guess_datetime_format(first)
+    if date_format is None:
+        return STRING, None
+    if pd.to_datetime(sample, format=date_format, errors='coerce').notna().all():
+        return DATETIME, date_format
+
+    return STRING, None
+
+
+def infer_schema(data, sample_size=SAMPLE_SIZE):
+    """Map each object column to (type, datetime format) using a sample of its values."""
+    schema = {}
+    for col in data.select_dtypes(include=['object']).columns:
+        sample = data[col].dropna()
+        if len(sample) > sample_size:
+            sample = sample.sample(sample_size, random_state=42)
+        schema[col] = _infer_column_type(sample.astype(str))
+    return schema
+
+
+def apply_schema(data, schema):
+    """Convert the columns of data in place following schema and return it."""
+    for col, (col_type, date_format) in schema.items():
+        if col not in data.columns:
+            continue
+        column = data[col]
+
+        if col_type == NUMERIC:
+            converted = pd.to_numeric(column, errors='coerce')
+        elif col_type == DATETIME:
+            converted = pd.to_datetime(column, format=date_format, errors='coerce')
+        else:
+            converted = None
+
+        # The sample can miss bad values, so fall back to string if conversion lost any
+        if converted is not None and converted.isna().sum() == column.isna().sum():
+            data[col] = converted
+        else:
+            data[col] = column.astype('string')
+    return data